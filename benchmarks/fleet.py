@@ -0,0 +1,266 @@
+#!/usr/bin/env python
+
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Synthetic fleet load generator and event-loop saturation benchmark.
+
+Starts N fake devices of a platform, each with the interfaces and link_uptime
+collectors started through the collector types (and therefore the functions
+registered by `interfaces.register` and `link_uptime.register`).  The device
+responses are replayed from generated capture files with a simulated device
+latency.  The collectors are driven on a periodic interval, and for each
+fleet size the benchmark reports:
+
+    * event loop lag percentiles (p50, p99, max)
+    * poll completion skew percentiles, the time from the interval tick to
+      the completion of the link_uptime poll
+    * CPU utilization and max RSS
+
+The output is a capacity curve per platform.
+
+Usage
+-----
+    invoke bench-fleet --platform eapi --devices 100,500,1000,2000
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from types import SimpleNamespace
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import statistics
+import time
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+import netpaca_interfaces as interfaces
+from netpaca_interfaces import link_uptime
+
+import parsers
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+LAG_PROBE_INTERVAL = 0.05
+
+_log = logging.getLogger("benchmark")
+
+
+def _device_class(platform: str):
+    """
+    Returns the platform Device class, and the modules that register the
+    collectors for the platform.
+    """
+    if platform == "eapi":
+        from netpaca.drivers.eapi import Device
+        from netpaca_interfaces import eapi  # noqa
+        from netpaca_interfaces.link_uptime import eapi  # noqa
+
+    elif platform == "nxapi":
+        from netpaca.drivers.nxapi import Device
+        from netpaca_interfaces import nxapi  # noqa
+        from netpaca_interfaces.link_uptime import nxapi  # noqa
+
+    elif platform == "nxos_ssh":
+        from netpaca.drivers.nxos_ssh import Device
+        from netpaca_interfaces import nxos_ssh  # noqa
+        from netpaca_interfaces.link_uptime import nxos_ssh  # noqa
+
+    else:
+        from netpaca.drivers.ios_ssh import Device
+        from netpaca_interfaces import ios_snmp  # noqa
+        from netpaca_interfaces.link_uptime import ios_snmp  # noqa
+
+        os.environ.setdefault("SNMP_COMMUNITY", "public")
+
+    class FleetDevice(Device):
+        """ platform Device without a connection, for collector dispatch """
+
+        def __init__(self, name: str):  # noqa - the driver is not initialized
+            self.name = name
+            self.log = _log
+            self.private = dict()
+
+    return FleetDevice
+
+
+def write_captures(platform: str, names, if_count: int, latency: float, path: Path):
+    """ write the generated responses as capture files, one per device """
+    if platform == "eapi":
+        rec = dict(json=parsers.eos_payload(if_count, time.time()))
+    elif platform == "nxapi":
+        rec = dict(xml=parsers.nxos_payload(if_count))
+    elif platform == "nxos_ssh":
+        rec = dict(text=parsers.nxos_payload(if_count))
+    else:
+        rec = dict(
+            snmp=dict(
+                sys_uptime=100_000_000,
+                snmp_uptime=1_000_000,
+                tables=parsers.ios_tables(if_count),
+            )
+        )
+
+    line = json.dumps(dict(ts=time.time(), elapsed=latency, **rec)) + "\n"
+    for name in names:
+        (path / f"{name}.jsonl").write_text(line)
+
+
+class FleetExecutor(object):
+    """
+    Runs each collector coroutine on the collection interval, in the same
+    manner as the netpaca collector executor, recording the completion skew of
+    the link_uptime polls.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.tasks = list()
+        self.skews = list()
+        self.metrics = 0
+
+    def start(self, spec, coro, device, **kwargs):
+        self.tasks.append(asyncio.create_task(self._run(spec, coro, device, kwargs)))
+
+    async def _run(self, spec, coro, device, kwargs):
+        loop = asyncio.get_running_loop()
+        tick = loop.time()
+
+        while True:
+            metrics = await coro(device, int(time.time() * 1000), **kwargs)
+
+            if spec.name == link_uptime.name:
+                self.skews.append(loop.time() - tick)
+                self.metrics += len(metrics or [])
+
+            tick += self.interval
+            await asyncio.sleep(max(tick - loop.time(), 0))
+
+
+async def monitor_loop_lag(lags: list):
+    loop = asyncio.get_running_loop()
+    while True:
+        t_start = loop.time()
+        await asyncio.sleep(LAG_PROBE_INTERVAL)
+        lags.append(loop.time() - t_start - LAG_PROBE_INTERVAL)
+
+
+def _pct(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    return sorted(values)[min(int(len(values) * pct), len(values) - 1)]
+
+
+async def run_fleet(args, count: int, replay_dir: Path) -> dict:
+    device_cls = _device_class(args.platform)
+    names = [f"{args.platform}-{num:05}" for num in range(count)]
+    write_captures(args.platform, names, args.interfaces, args.latency, replay_dir)
+
+    executor = FleetExecutor(args.interval)
+    if_spec = SimpleNamespace(
+        name=interfaces.name,
+        config=interfaces.InterfaceRawCollectorConfig(
+            replay_dir=str(replay_dir), poll_stagger=args.stagger
+        ),
+    )
+    lu_spec = SimpleNamespace(
+        name=link_uptime.name,
+        config=link_uptime.LinkUptimeCollectorConfig(batch_interval=args.batch),
+    )
+
+    lags = list()
+    lag_task = asyncio.create_task(monitor_loop_lag(lags))
+
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+
+    for name in names:
+        device = device_cls(name)
+        await interfaces.InterfaceRawCollectorType.start(device, executor, if_spec)
+        await link_uptime.LinkUptimeCollectorType.start(device, executor, lu_spec)
+
+    await asyncio.sleep(args.duration)
+
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+
+    for task in executor.tasks + [lag_task]:
+        task.cancel()
+
+    await asyncio.gather(*executor.tasks, lag_task, return_exceptions=True)
+
+    return {
+        "devices": count,
+        "lag_p50": round(_pct(lags, 0.50), 4),
+        "lag_p99": round(_pct(lags, 0.99), 4),
+        "lag_max": round(max(lags, default=0), 4),
+        "skew_p50": round(_pct(executor.skews, 0.50), 3),
+        "skew_p99": round(_pct(executor.skews, 0.99), 3),
+        "skew_mean": round(statistics.mean(executor.skews or [0]), 3),
+        "cpu_pct": round(100 * cpu / wall, 1),
+        "rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "metrics": executor.metrics,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--platform", choices=list(parsers.PLATFORMS), default="eapi")
+    parser.add_argument("--devices", default="100,500,1000,2000")
+    parser.add_argument("--interfaces", type=int, default=48)
+    parser.add_argument("--interval", type=float, default=10.0)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--stagger", type=int, default=None)
+    parser.add_argument("--batch", type=int, default=None, help="batch interval (ms)")
+    parser.add_argument("--json", action="store_true", help="output JSON lines")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    print(f"capacity curve: {args.platform}, {args.interfaces} interfaces/device")
+
+    for count in map(int, args.devices.split(",")):
+        with TemporaryDirectory() as replay_dir:
+            result = asyncio.run(run_fleet(args, count, Path(replay_dir)))
+
+        if args.json:
+            print(json.dumps(result))
+            continue
+
+        print(
+            f"{count:>6} devices: "
+            f"lag p50/p99/max {result['lag_p50']}/{result['lag_p99']}/{result['lag_max']}s  "
+            f"skew p50/p99 {result['skew_p50']}/{result['skew_p99']}s  "
+            f"cpu {result['cpu_pct']}%  rss {result['rss_mb']}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
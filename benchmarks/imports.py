@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Import-time benchmark of the collector modules.
+
+Each module is imported in a fresh interpreter with `python -X importtime`,
+reporting the total import time, the max RSS of the interpreter, and the
+heaviest imports.  The "first poll" rows also import the heavy dependencies
+of the platform, as done when the first device of the platform is polled.
+
+Usage
+-----
+    invoke bench-imports
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+MODULES = {
+    "eapi": ["netpaca_interfaces.eapi", "netpaca_interfaces.link_uptime.eapi"],
+    "nxapi": ["netpaca_interfaces.nxapi", "netpaca_interfaces.link_uptime.nxapi"],
+    "nxos_ssh": [
+        "netpaca_interfaces.nxos_ssh",
+        "netpaca_interfaces.link_uptime.nxos_ssh",
+    ],
+    "ios_snmp": [
+        "netpaca_interfaces.ios_snmp",
+        "netpaca_interfaces.link_uptime.ios_snmp",
+    ],
+}
+
+# the dependencies imported by the first poll of a device of the platform.
+
+FIRST_POLL = {
+    "eapi": ["maya"],
+    "nxapi": ["maya"],
+    "nxos_ssh": ["maya", "lxml.etree"],
+    "ios_snmp": ["maya", "pysnmp.hlapi.asyncio", "netpaca.aiosnmp.interfaces"],
+}
+
+_RSS_SCRIPT = """
+import resource
+{imports}
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def import_profile(modules) -> dict:
+    """
+    Returns the import profile of the modules, imported in a fresh interpreter:
+    the total import time (ms), the max RSS (MB), and the cumulative import
+    time (ms) of each top-level import.
+    """
+    script = _RSS_SCRIPT.format(imports="\n".join(f"import {mod}" for mod in modules))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    top = dict()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, name = line.split("|")
+
+        # nested imports are indented in the package name column
+        if name.startswith("  "):
+            continue
+
+        top[name.strip()] = int(cumulative) / 1000
+
+    return {
+        "total_ms": sum(top.values()),
+        "rss_mb": int(proc.stdout.strip()) / 1024,
+        "top": top,
+    }
+
+
+def measure(modules, repeat: int) -> dict:
+    """ returns the median profile of repeated imports """
+    runs = [import_profile(modules) for _ in range(repeat)]
+    best = min(runs, key=lambda run: run["total_ms"])
+    return {
+        "total_ms": statistics.median(run["total_ms"] for run in runs),
+        "rss_mb": statistics.median(run["rss_mb"] for run in runs),
+        "top": best["top"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--platform", choices=list(MODULES), action="append")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="show the N heaviest")
+    args = parser.parse_args()
+
+    baseline = measure([], args.repeat)
+    print(
+        f"{'interpreter':<22} {baseline['total_ms']:>8.1f}ms "
+        f"{baseline['rss_mb']:>7.1f}MB"
+    )
+
+    for platform in args.platform or MODULES:
+        for label, modules in [
+            ("startup", MODULES[platform]),
+            ("first poll", MODULES[platform] + FIRST_POLL[platform]),
+        ]:
+            result = measure(modules, args.repeat)
+            print(
+                f"{platform + ' ' + label:<22} {result['total_ms']:>8.1f}ms "
+                f"{result['rss_mb']:>7.1f}MB"
+            )
+
+            heaviest = sorted(result["top"].items(), key=lambda kv: -kv[1])
+            for name, msec in heaviest[: args.top]:
+                print(f"    {name:<40} {msec:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
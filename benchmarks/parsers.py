@@ -0,0 +1,295 @@
+#!/usr/bin/env python
+
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Benchmark of the interfaces and link_uptime collector coroutines for each of
+the four platforms (EOS EAPI, NX-OS NXAPI, NX-OS SSH, IOS SNMP) at 48, 200 and
+1000 interface scale.  The collectors are run against stub Device objects that
+return generated payloads, in the same shape as the device responses.
+
+For each platform and scale the benchmark reports the number of polls per
+second (interfaces + link_uptime) and the number of memory allocations per
+interface.  Results can be saved as a baseline and later compared to catch
+regressions.
+
+Usage
+-----
+    invoke bench [--save] [--compare]
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from types import SimpleNamespace
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+import tracemalloc
+
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+from lxml import etree
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+import netpaca_interfaces as interfaces
+from netpaca_interfaces import link_uptime
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+SCALES = [48, 200, 1000]
+BASELINE_FILE = Path(__file__).parent / ".baseline.json"
+REGRESSION_THRESHOLD = 0.10
+
+_log = logging.getLogger("benchmark")
+
+# -----------------------------------------------------------------------------
+#                              Payload Generators
+# -----------------------------------------------------------------------------
+
+
+def eos_payload(count: int, epoch_now: float) -> dict:
+    """ EAPI "show interfaces" output """
+    return {
+        "interfaces": {
+            f"Ethernet{num}": {
+                "interfaceStatus": "connected" if num % 4 else "notconnect",
+                "lastStatusChangeTimestamp": epoch_now - num * 317,
+                "description": f"server-{num:04} eth0",
+            }
+            for num in range(1, count + 1)
+        }
+    }
+
+
+def nxos_payload(count: int) -> str:
+    """ NX-OS "show interface | xml" content """
+    rows = "".join(
+        "<ROW_interface>"
+        f"<interface>Ethernet1/{num}</interface>"
+        f"<state>{'up' if num % 4 else 'down'}</state>"
+        f"<desc>server-{num:04} eth0</desc>"
+        "<eth_link_flapped>"
+        + ("never" if num % 7 == 0 else ("07:20:17" if num % 2 else "3d04h"))
+        + "</eth_link_flapped>"
+        "</ROW_interface>"
+        for num in range(1, count + 1)
+    )
+    return f"<__readonly__><TABLE_interface>{rows}</TABLE_interface></__readonly__>"
+
+
+def ios_tables(count: int) -> list:
+    """ IOS SNMP table walk results: ifName, ifAlias, ifOperStatus, ifLastChange """
+    index = range(1, count + 1)
+    return [
+        {num: f"Gi1/0/{num}" for num in index},
+        {num: f"server-{num:04} eth0" for num in index},
+        {num: bool(num % 4) for num in index},
+        {num: (num % 7) * 12_345 for num in index},
+    ]
+
+
+# -----------------------------------------------------------------------------
+#                                 Stub Devices
+# -----------------------------------------------------------------------------
+
+
+def _stub_device(**attrs) -> SimpleNamespace:
+    return SimpleNamespace(name="bench-device", log=_log, private={}, **attrs)
+
+
+class _StubExecutor(object):
+    def start(self, **kwargs):
+        pass
+
+
+def _async_return(value):
+    async def coro(*args, **kwargs):
+        return value
+
+    return coro
+
+
+def make_eapi(count: int):
+    from netpaca_interfaces import eapi
+    from netpaca_interfaces.link_uptime import eapi as lu_eapi
+
+    res = SimpleNamespace(ok=True, output=eos_payload(count, time.time()))
+    device = _stub_device(eapi=SimpleNamespace(exec=_async_return([res])))
+    return device, eapi, eapi.get_interfaces, lu_eapi.get_link_flaps
+
+
+def make_nxapi(count: int):
+    from netpaca_interfaces import nxapi
+    from netpaca_interfaces.link_uptime import nxapi as lu_nxapi
+
+    res = SimpleNamespace(ok=True, output=etree.fromstring(nxos_payload(count)))
+    device = _stub_device(nxapi=SimpleNamespace(exec=_async_return([res])))
+    return device, nxapi, nxapi.get_raw_interfaces, lu_nxapi.get_link_uptimes
+
+
+def make_nxos_ssh(count: int):
+    from netpaca_interfaces import nxos_ssh
+    from netpaca_interfaces.link_uptime import nxapi as lu_nxapi
+
+    text = f"switch# show interface | xml\n{nxos_payload(count)}\nswitch# "
+    res = SimpleNamespace(failed=False, result=text)
+    device = _stub_device(driver=SimpleNamespace(send_command=_async_return(res)))
+    return device, nxos_ssh, nxos_ssh.get_raw_interfaces, lu_nxapi.get_link_uptimes
+
+
+def make_ios_snmp(count: int):
+    from netpaca_interfaces import ios_snmp
+    from netpaca_interfaces.link_uptime import ios_snmp as lu_ios
+
+    # the collector imports the netpaca SNMP functions on each poll, so they
+    # are replaced in the netpaca modules with the generated table walk results.
+
+    import netpaca.aiosnmp.system as snmp_system
+    import netpaca.aiosnmp.interfaces as snmp_ifs
+
+    os.environ.setdefault("SNMP_COMMUNITY", "public")
+    tables = ios_tables(count)
+    snmp_system.get_sys_uptime = _async_return(100_000_000)
+    snmp_system.get_snmpengine_uptime = _async_return(1_000_000)
+    snmp_ifs.get_if_name_table = _async_return(tables[0])
+    snmp_ifs.get_if_alias_table = _async_return(tables[1])
+    snmp_ifs.get_if_operstatus_table = _async_return(tables[2])
+    snmp_ifs.get_if_lastchange_table = _async_return(tables[3])
+    return _stub_device(), ios_snmp, ios_snmp.get_interfaces, lu_ios.get_link_uptimes
+
+
+PLATFORMS = {
+    "eapi": make_eapi,
+    "nxapi": make_nxapi,
+    "nxos_ssh": make_nxos_ssh,
+    "ios_snmp": make_ios_snmp,
+}
+
+# -----------------------------------------------------------------------------
+#                                   Runner
+# -----------------------------------------------------------------------------
+
+
+async def run_one(platform: str, count: int, duration: float) -> dict:
+    device, module, get_ifs, get_uptimes = PLATFORMS[platform](count)
+
+    if_spec = SimpleNamespace(config=interfaces.InterfaceRawCollectorConfig())
+    lu_config = link_uptime.LinkUptimeCollectorConfig()
+
+    if platform == "ios_snmp":
+        # avoid the pysnmp engine setup in the IOS start coroutine.
+        device.private["interfaces"] = {
+            "event": asyncio.Event(),
+            "poll": None,
+            "breaker": None,
+        }
+    else:
+        await module.start(device, _StubExecutor(), if_spec)
+
+    async def poll():
+        await get_ifs(device, 0, if_spec.config)
+        return await get_uptimes(device, 0, lu_config)
+
+    # warm-up, and measure the allocations of a single poll.
+
+    await poll()
+    tracemalloc.start()
+    await poll()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocs = sum(stat.count for stat in snapshot.statistics("filename"))
+
+    polls = 0
+    t_start = time.perf_counter()
+    while (elapsed := time.perf_counter() - t_start) < duration:
+        await poll()
+        polls += 1
+
+    return {
+        "ops_per_sec": round(polls / elapsed, 1),
+        "allocs_per_if": round(allocs / count, 2),
+    }
+
+
+def compare(results: dict, baseline: dict) -> list:
+    regressions = list()
+
+    for key, result in results.items():
+        if (base := baseline.get(key)) is None:
+            continue
+
+        ops, base_ops = result["ops_per_sec"], base["ops_per_sec"]
+        if ops < base_ops * (1 - REGRESSION_THRESHOLD):
+            regressions.append(f"{key}: ops/sec {ops} < baseline {base_ops}")
+
+        allocs, base_allocs = result["allocs_per_if"], base["allocs_per_if"]
+        if allocs > base_allocs * (1 + REGRESSION_THRESHOLD):
+            regressions.append(f"{key}: allocs/if {allocs} > baseline {base_allocs}")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--platform", action="append", choices=list(PLATFORMS))
+    parser.add_argument("--duration", type=float, default=1.0)
+    parser.add_argument("--save", action="store_true", help="save results as baseline")
+    parser.add_argument("--compare", action="store_true", help="compare to baseline")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    results = dict()
+
+    for platform in args.platform or PLATFORMS:
+        for count in SCALES:
+            key = f"{platform}/{count}"
+            results[key] = asyncio.run(run_one(platform, count, args.duration))
+            print(
+                f"{key:16} {results[key]['ops_per_sec']:>10} ops/sec "
+                f"{results[key]['allocs_per_if']:>8} allocs/if"
+            )
+
+    if args.save:
+        BASELINE_FILE.write_text(json.dumps(results, indent=2))
+        print(f"baseline saved: {BASELINE_FILE}")
+
+    if args.compare:
+        if not BASELINE_FILE.exists():
+            raise SystemExit(f"no baseline: {BASELINE_FILE}")
+
+        if regressions := compare(results, json.loads(BASELINE_FILE.read_text())):
+            raise SystemExit("REGRESSIONS:\n  " + "\n  ".join(regressions))
+
+        print("no regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Benchmark of the link uptime computations, the Python loop versus the NumPy
+array operations, for the EOS and IOS data at 1k and 10k interfaces.
+
+Usage
+-----
+    invoke bench-uptime
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from types import SimpleNamespace
+import logging
+import time
+import timeit
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca_interfaces.link_uptime import uptime
+
+import parsers
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+SCALES = [1_000, 10_000]
+THRESHOLD = 1_440
+
+
+def ios_data(count: int) -> dict:
+    """ the IOS interfaces collector data, keyed by interface name """
+    name_t, alias_t, oper_t, lastchange_t = parsers.ios_tables(count)
+    return {
+        name: dict(
+            if_name=name,
+            if_desc=alias_t[idx],
+            if_link_up=oper_t[idx],
+            if_lastchange=lastchange_t[idx],
+        )
+        for idx, name in name_t.items()
+    }
+
+
+def _best(func, number: int = 20) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+def main():
+    if not uptime._vectorize(True, uptime.VECTORIZE_MIN):
+        raise SystemExit("NumPy is not installed")
+
+    device = SimpleNamespace(
+        name="bench-device",
+        log=logging.getLogger("benchmark"),
+        private=dict(
+            sys_uptime=100_000_000, orig_sys_uptime=100_000_000, sys_uptime_wrapped=0
+        ),
+    )
+
+    uptime.VECTORIZE_MIN = 0
+    print(f"{'':<4} {'interfaces':>10} {'python':>10} {'numpy':>10} {'speedup':>8}")
+
+    for count in SCALES:
+        now = time.time()
+        eos = parsers.eos_payload(count, now)["interfaces"]
+        ios = ios_data(count)
+
+        cases = {
+            "eos": lambda vec: uptime.eos_uptimes(eos, now, THRESHOLD, vec),
+            "ios": lambda vec: uptime.ios_uptimes(device, ios, THRESHOLD, vec),
+        }
+
+        for platform, func in cases.items():
+            t_python = _best(lambda: func(False))
+            t_numpy = _best(lambda: func(True))
+
+            print(
+                f"{platform:<4} {count:>10} {t_python * 1e3:>8.2f}ms "
+                f"{t_numpy * 1e3:>8.2f}ms {t_python / t_numpy:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -16,11 +16,264 @@
 
 """
 This file contains the collctor definition for Link Flap.
+
+The platform modules (eapi, nxapi, nxos_ssh, ios_snmp) import their heavy
+dependencies (maya, lxml, pysnmp) when first used by a device collector, so
+that a deployment only loads the dependencies of the platforms it polls.
 """
 
-from netpaca.collectors import CollectorType
+from typing import Optional, List
+from pydantic.dataclasses import dataclass
+from pydantic import Field
+
+from netpaca import Metric
+from netpaca.collectors import CollectorType, CollectorConfigModel
 from netpaca.config_model import CollectorModel  # noqa
 
+# -----------------------------------------------------------------------------
+#
+#                              Collector Config
+# -----------------------------------------------------------------------------
+# Define the collector configuraiton options that the User can set in their
+# configuration file.
+# -----------------------------------------------------------------------------
+
+
+class InterfaceRawCollectorConfig(CollectorConfigModel):
+    """ interfaces collector configuration options """
+
+    poll_backoff_max: Optional[int] = Field(
+        default=None,
+        description="""\
+Enables adaptive polling.  Devices without recent link flaps are polled less
+often, backing off up to $poll_backoff_max collection intervals between polls.
+""",
+    )
+
+    poll_flap_window: int = Field(
+        default=30,
+        description="""\
+When adaptive polling is enabled, a device with a link uptime less than
+$poll_flap_window minutes is polled on every collection interval.
+""",
+    )
+
+    poll_jitter: float = Field(
+        default=0.1,
+        description="""\
+When adaptive polling is enabled, the random jitter added to the backoff as a
+fraction of the backoff.
+""",
+    )
+
+    poll_stagger: Optional[int] = Field(
+        default=None,
+        description="""\
+Spread device polls over the first $poll_stagger seconds of each collection
+interval using a deterministic per-device offset.  The value should be less
+than the collection interval.
+""",
+    )
+
+    poll_concurrency: Optional[int] = Field(
+        default=None,
+        description="""\
+Limit the number of device polls that are in-flight at the same time across all
+devices.
+""",
+    )
+
+    poll_priority_file: Optional[str] = Field(
+        default=None,
+        description="""\
+CSV file with the "host" and "priority" columns giving the device priority
+tiers, 0 being the highest; for example the inventory file.  Under
+$poll_concurrency the higher priority devices are given the poll slots first.
+""",
+    )
+
+    poll_priority_default: int = Field(
+        default=1, description="the priority tier of devices not in the file"
+    )
+
+    poll_shed_wait: Optional[float] = Field(
+        default=None,
+        description="""\
+Under $poll_concurrency, skip the poll of a device below the top priority tier
+if it waits more than $poll_shed_wait seconds for a poll slot.  Skipped polls
+are reported as metrics.
+""",
+    )
+
+    breaker_threshold: Optional[int] = Field(
+        default=None,
+        description="""\
+Enables the circuit breaker.  After $breaker_threshold consecutive failed polls
+the device is not polled for $breaker_backoff seconds, doubling on each further
+failure up to $breaker_backoff_max seconds, after which a single probe poll is
+made.
+""",
+    )
+
+    breaker_backoff: int = Field(
+        default=60, description="circuit breaker initial backoff in seconds"
+    )
+
+    breaker_backoff_max: int = Field(
+        default=3_600, description="circuit breaker maximum backoff in seconds"
+    )
+
+    poll_timeout: Optional[float] = Field(
+        default=None,
+        description="""\
+The deadline, in seconds, for each device poll.  The fetch of the interface data
+is given ($poll_timeout * (1 - $poll_parse_share)) seconds, the remainder is
+the budget for processing the data.  Polls that exceed their deadline are
+reported as overrun metrics.
+""",
+    )
+
+    poll_parse_share: float = Field(
+        default=0.2,
+        description="the share of $poll_timeout reserved for processing the data",
+    )
+
+    instrument: bool = Field(
+        default=False,
+        description="emit the collector_poll_stats metrics for each device poll",
+    )
+
+    if_include: Optional[str] = Field(
+        default=None,
+        description="only collect the interfaces with names matching this regex",
+    )
+
+    if_exclude: Optional[str] = Field(
+        default=None,
+        description="do not collect the interfaces with names matching this regex",
+    )
+
+    if_types: Optional[List[str]] = Field(
+        default=None,
+        description="""\
+Only collect the interfaces of these types: "ethernet", "port-channel",
+"subinterface", "vlan", "loopback", "management", "tunnel", "nve", "other".
+""",
+    )
+
+    if_range: Optional[str] = Field(
+        default=None,
+        description="""\
+The interface range added to the device show interface command, so that only
+these interfaces are fetched; for example "Ethernet1-48" (EOS) or
+"ethernet1/1-48" (NX-OS).  Not used for IOS.
+""",
+    )
+
+    capture_dir: Optional[str] = Field(
+        default=None,
+        description="""\
+Record each raw device response to the file $capture_dir/<device-name>.jsonl
+for offline replay.
+""",
+    )
+
+    replay_dir: Optional[str] = Field(
+        default=None,
+        description="""\
+Replay the device responses from the files in $replay_dir, as recorded by
+$capture_dir, instead of polling the device.
+""",
+    )
+
+    replay_latency_scale: float = Field(
+        default=1.0, description="scale factor applied to the recorded latency"
+    )
+
+    replay_flap_rate: float = Field(
+        default=0.0,
+        description="probability of a link flap per interface per replayed response",
+    )
+
+    snapshot_store: Optional[str] = Field(
+        default=None,
+        description="""\
+The SQLite database file used to persist the last interface snapshot of each
+device, so that the collectors resume with a baseline after a restart.
+""",
+    )
+
+    snapshot_flush_interval: int = Field(
+        default=60, description="seconds between writes to the $snapshot_store"
+    )
+
+    memory_report: Optional[int] = Field(
+        default=None,
+        description="""\
+Enables the tracemalloc memory accounting; every $memory_report seconds the
+top allocations and the retained memory of each device are logged.
+""",
+    )
+
+    memory_top: int = Field(
+        default=20, description="the number of entries in the memory report"
+    )
+
+    memory_metrics: bool = Field(
+        default=False,
+        description="emit the collector_memory_bytes metrics for each device",
+    )
+
+
+# -----------------------------------------------------------------------------
+#
+#                              Metrics
+#
+# -----------------------------------------------------------------------------
+# This section defines the Metric types supported by the Interfaces Collector
+# -----------------------------------------------------------------------------
+
+
+@dataclass
+class InterfacesPollOverrunMetric(Metric):
+    """ Device poll exceeded its deadline, value is the elapsed seconds """
+
+    value: float
+    name: str = "interfaces_poll_overrun"
+
+
+@dataclass
+class InterfacesPollSkippedMetric(Metric):
+    """ Device poll was shed under overload, value is the count of shed polls """
+
+    value: int
+    name: str = "interfaces_poll_skipped"
+
+
+@dataclass
+class CollectorPollStatMetric(Metric):
+    """
+    Collector self-instrumentation, one metric per statistic.  The "collector"
+    tag identifies the collector, and the "stat" tag the statistic; for
+    example "fetch_latency" (seconds), "payload_bytes", "interface_count".
+    """
+
+    value: float
+    name: str = "collector_poll_stats"
+
+
+@dataclass
+class CollectorMemoryMetric(Metric):
+    """
+    Collector memory accounting, the retained bytes of one device entry.  The
+    "entry" tag is the device private entry, for example "interfaces", or the
+    collector output as "output:<collector>".
+    """
+
+    value: int
+    name: str = "collector_memory_bytes"
+
+
 # -----------------------------------------------------------------------------
 #
 #                              Collector Definition
@@ -45,6 +298,13 @@ class InterfaceRawCollectorType(CollectorType):
     description = """
 Used to collect the raw interfaces data to share amoung other collectors
 """
+    config = InterfaceRawCollectorConfig
+    metrics = [
+        InterfacesPollOverrunMetric,
+        InterfacesPollSkippedMetric,
+        CollectorPollStatMetric,
+        CollectorMemoryMetric,
+    ]
 
 
 # create an "alias" variable so that the device specific collector packages
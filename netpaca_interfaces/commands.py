@@ -0,0 +1,83 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the command batching of the EAPI and NXAPI interfaces
+collectors.
+
+Other collectors that need the output of additional device commands register
+them with `register`, typically in their start coroutine.  The interfaces
+collector sends the registered commands in the same exec request as its own
+"show interface" command, so that there is one device request per poll however
+many collectors are enabled, and stores each command output before setting the
+interfaces "event".  The consumer collectors then get the output with
+`result`.
+
+The registered commands are stored in the device private area as "commands",
+mapping the command to the output of the last poll (None when not available).
+The interfaces command is sent first, so that a failing registered command
+does not prevent the interface data from being collected.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Optional, Any, List
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = ["register", "registered", "dispatch", "result"]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+
+def register(device, command: str):
+    """ register the command to be sent with the interfaces collector request """
+    device.private.setdefault("commands", dict()).setdefault(command, None)
+
+
+def registered(device) -> List[str]:
+    """ returns the registered commands of the device """
+    return list(device.private.get("commands", ()))
+
+
+def dispatch(device, commands: List[str], responses: List):
+    """
+    Store the output of the registered commands from the exec responses; the
+    output is None for a command that failed or has no response.
+    """
+    outputs = device.private["commands"]
+    responses = list(responses)
+    responses += [None] * (len(commands) - len(responses))
+
+    for command, res in zip(commands, responses):
+        if res is None or not res.ok:
+            device.log.warning(f"{device.name}: command failed: {command}")
+            outputs[command] = None
+            continue
+
+        outputs[command] = res.output
+
+
+def result(device, command: str) -> Optional[Any]:
+    """ returns the output of the registered command from the last poll """
+    return device.private.get("commands", {}).get(command)
@@ -22,11 +22,11 @@ This file implements the interfaces collector for Arista EAPI devices.
 
 from typing import Optional, List
 from asyncio import Event
+import asyncio
 
 # -----------------------------------------------------------------------------
 # Public Imports
 # -----------------------------------------------------------------------------
-import maya
 
 from netpaca import Metric, MetricTimestamp
 from netpaca.collectors.executor import CollectorExecutor
@@ -38,6 +38,8 @@ from netpaca.config_model import CollectorModel
 # -----------------------------------------------------------------------------
 
 import netpaca_interfaces as interfaces
+from netpaca_interfaces import polling, instrument, replay, sharding, snapshot
+from netpaca_interfaces import filters, commands
 
 # -----------------------------------------------------------------------------
 # Exports (none)
@@ -77,9 +79,23 @@ async def start(device: Device, executor: CollectorExecutor, spec: CollectorMode
         The collector model instance that contains information about the
         collector; for example the collector configuration values.
     """
+    # in the sharded run mode, the collector is only started for the devices
+    # owned by this worker process.
+
+    if not sharding.owns(device):
+        return
+
     device.log.info(f"{device.name}: Starting Arista EOS interfaces collector")
 
-    device.private["interfaces"] = {"event": Event()}
+    device.private["interfaces"] = {
+        "event": Event(),
+        "poll": polling.adaptive_poll(spec.config),
+        "breaker": polling.circuit_breaker(spec.config),
+    }
+
+    # when replay is enabled, the device responses are served from the recorded
+    # capture file rather than the device.
+    replay.attach(device, spec.config)
 
     executor.start(
         # required args
@@ -98,6 +114,7 @@ async def start(device: Device, executor: CollectorExecutor, spec: CollectorMode
 # -----------------------------------------------------------------------------
 
 
+@instrument.instrumented(interfaces.name)
 async def get_interfaces(
     device: Device, timestamp: MetricTimestamp, config  # noqa
 ) -> Optional[List[Metric]]:
@@ -120,16 +137,65 @@ async def get_interfaces(
     -------
     list of Metic items, or None
     """
+    import maya
+
+    # when adaptive polling is enabled, skip this collection interval if the
+    # device is currently backed off.
+
+    if (poll := device.private["interfaces"]["poll"]) and not poll.should_poll():
+        return None
+
+    # when the circuit breaker is open, skip polling the failing device.
+
+    if (breaker := device.private["interfaces"]["breaker"]) and not breaker.allow():
+        return None
+
+    # in the cluster mode, only poll the devices owned by this node.
+
+    if not sharding.cluster_owns(device):
+        return None
+
+    deadline = polling.PollDeadline(config)
+
+    try:
+        async with polling.poll_slot(device, config):
+            with instrument.phase("fetch"):
+                command = filters.show_interface("show interfaces", config)
+                extra = commands.registered(device)
+                res = await deadline.fetch(device.eapi.exec([command, *extra]))
+
+    except polling.PollShed:
+        return polling.poll_shed(device, timestamp)
+
+    except asyncio.TimeoutError:
+        device.log.error(
+            f"{device.name}: interface data not received within "
+            f"{deadline.fetch_timeout}s, will try again."
+        )
+        polling.poll_failed(device)
+        return deadline.overrun(timestamp, "fetch")
 
-    res = await device.eapi.exec(["show interfaces"])
     sh_iface = res[0]
 
     if not sh_iface.ok:
         device.log.error(
             f"{device.name}/{interfaces.name}: unable to obtain interface data, will try again."
         )
+        polling.poll_failed(device)
         return None
 
+    replay.capture(device, config, deadline.elapsed, json=sh_iface.output)
+
+    # store the output of the commands registered by the other collectors.
+
+    if extra:
+        commands.dispatch(device, extra, res[1:])
+
+    # remove the interfaces that are not selected by the configured filter.
+
+    if flt := filters.interface_filter(config):
+        filters.filter_eapi(flt, sh_iface.output)
+
     # store the raw interfaces data into the private area of the device instance
     # so that it can be used by other collectors.  The method used here is just
     # a first trial; might use something different in the future.
@@ -138,7 +204,18 @@ async def get_interfaces(
         {"ts": timestamp, "maya_ts": maya.now(), "data": sh_iface.output}
     )
 
+    instrument.record("interface_count", len(sh_iface.output["interfaces"]))
+
+    if snapshot.wanted(device, config):
+        snapshot.store(device, config, snapshot.normalize_eapi(sh_iface.output))
+
+    polling.poll_succeeded(device)
+
     # trigger the pending tasks to awake to process the data.
     device.private["interfaces"]["event"].set()
 
-    return None
+    if poll:
+        poll.polled()
+
+    # report an overrun if processing the data exceeded the poll deadline.
+    return deadline.overrun(timestamp, "parse") or None
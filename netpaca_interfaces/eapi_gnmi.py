@@ -0,0 +1,188 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+This file implements the streaming telemetry interfaces collector for Arista
+EOS devices.  Rather than polling "show interfaces" the collector maintains a
+gNMI ON_CHANGE subscription to the device, and publishes the interface data in
+the same structure as the EAPI "show interfaces" output so that the
+link_uptime.eapi collector consumes it unchanged.
+
+Use this module in place of `netpaca_interfaces.eapi` in the device driver
+modules list.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Optional, List, Dict
+import asyncio
+
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+from netpaca import Metric, MetricTimestamp
+from netpaca.collectors.executor import CollectorExecutor
+from netpaca.drivers.eapi import Device
+from netpaca.config_model import CollectorModel
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+import netpaca_interfaces as interfaces
+from netpaca_interfaces import gnmi, instrument, sharding
+
+# -----------------------------------------------------------------------------
+# Exports (none)
+# -----------------------------------------------------------------------------
+
+__all__ = []
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#
+#                 Register Arista Device gNMI to Colletor Type
+#
+# -----------------------------------------------------------------------------
+
+
+@interfaces.register
+async def start(device: Device, executor: CollectorExecutor, spec: CollectorModel):
+    """
+    The interfaces collector start coroutine for Arista EOS devices using gNMI
+    streaming telemetry.  The subscription is run as a background task for the
+    lifetime of the collector, and the executor task periodically publishes
+    the interface data for the consuming collectors.
+
+    Parameters
+    ----------
+    device:
+        The device driver instance for the Arista device
+
+    executor:
+        The executor that is used to start one or more collector tasks. In this
+        instance, there is only one collector task started per device.
+
+    spec:
+        The collector model instance that contains information about the
+        collector; for example the collector configuration values.
+    """
+    # in the sharded run mode, the collector is only started for the devices
+    # owned by this worker process.
+
+    if not sharding.owns(device):
+        return
+
+    device.log.info(f"{device.name}: Starting Arista EOS gNMI interfaces collector")
+
+    store = dict()
+    device.private["interfaces"] = {
+        "event": asyncio.Event(),
+        "gnmi": store,
+        "gnmi_task": asyncio.create_task(gnmi.run_subscription(device, store)),
+    }
+
+    executor.start(
+        # required args
+        spec=spec,
+        coro=publish_interfaces,
+        device=device,
+        # kwargs to collector coroutine:
+        config=spec.config,
+    )
+
+
+# -----------------------------------------------------------------------------
+#
+#                             Collector Coroutine
+#
+# -----------------------------------------------------------------------------
+
+
+def as_eapi_output(store: Dict[str, Dict]) -> Dict:
+    """
+    Transform the gNMI interface store into the subset of the EAPI "show
+    interfaces" structure that is used by the consuming collectors.  The
+    interfaces without a last-change value are not included until it is
+    received.
+    """
+    return {
+        "interfaces": {
+            if_name: {
+                "interfaceStatus": (
+                    "connected" if leafs.get("oper-status") == "UP" else "notconnect"
+                ),
+                # OpenConfig last-change is nanoseconds since epoch, EOS reports
+                # the value as seconds since epoch.
+                "lastStatusChangeTimestamp": int(leafs["last-change"]) / 1e9,
+                "description": leafs.get("description", ""),
+            }
+            for if_name, leafs in store.items()
+            if "last-change" in leafs
+        }
+    }
+
+
+@instrument.instrumented(interfaces.name)
+async def publish_interfaces(
+    device: Device, timestamp: MetricTimestamp, config  # noqa
+) -> Optional[List[Metric]]:
+    """
+    This coroutine will be executed as a asyncio Task on a periodic basis, the
+    purpose is to publish the interface data maintained by the gNMI
+    subscription to the consuming collectors.
+
+    Parameters
+    ----------
+    device:
+        The Arista device driver instance for this device.
+
+    timestamp: MetricTimestamp
+        The current timestamp
+
+    config:
+        The collector configuration options
+
+    Returns
+    -------
+    None, there are no metrics exported by this collector.
+    """
+    import maya
+
+    ifs = device.private["interfaces"]
+
+    if not ifs["gnmi"]:
+        device.log.warning(
+            f"{device.name}/{interfaces.name}: no gNMI interface data yet, will try again."
+        )
+        return None
+
+    with instrument.phase("parse"):
+        data = as_eapi_output(ifs["gnmi"])
+
+    ifs.update({"ts": timestamp, "maya_ts": maya.now(), "data": data})
+    instrument.record("interface_count", len(ifs["gnmi"]))
+
+    # trigger the pending tasks to awake to process the data.
+    ifs["event"].set()
+
+    return None
@@ -0,0 +1,170 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the interface filters of the interfaces collector.
+
+The interfaces are selected by the interfaces collector config options
+if_include and if_exclude (name regular expressions) and if_types (the
+interface types, see `interface_type`).  The filter is applied to the device
+data as it is extracted, so that the interfaces that are not selected are not
+stored for, or processed by, the other collectors.
+
+Where the platform allows, the selection can also be pushed down into the
+device command with config.if_range, for example "Ethernet1-48" for EOS or
+"ethernet1/1-48" for NX-OS, reducing the size of the device response.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Optional, Tuple, Dict
+import re
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = [
+    "InterfaceFilter",
+    "interface_filter",
+    "interface_type",
+    "show_interface",
+    "filter_eapi",
+    "filter_nxos",
+]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+# the interface types by name, the first match is used.
+
+_IF_TYPES = [
+    ("subinterface", re.compile(r"\S+\.\d+$")),
+    ("port-channel", re.compile(r"(port-channel|po)\d", re.I)),
+    ("ethernet", re.compile(r"(\w*ethernet|eth?|gi|te|tw|fo|hu|fa)\d", re.I)),
+    ("vlan", re.compile(r"vl(an)?\d", re.I)),
+    ("loopback", re.compile(r"(loopback|lo)\d", re.I)),
+    ("management", re.compile(r"(management|mgmt|ma)\d", re.I)),
+    ("tunnel", re.compile(r"(tunnel|tu)\d", re.I)),
+    ("nve", re.compile(r"nve\d", re.I)),
+]
+
+
+def interface_type(if_name: str) -> str:
+    """
+    Returns the interface type of the interface name: "ethernet",
+    "port-channel", "subinterface", "vlan", "loopback", "management", "tunnel",
+    "nve", or "other".
+    """
+    for if_type, pattern in _IF_TYPES:
+        if pattern.match(if_name):
+            return if_type
+
+    return "other"
+
+
+class InterfaceFilter(object):
+    """
+    Selects the interfaces by name and type.  The result for each interface
+    name is cached, as the same names are seen on each poll.
+
+    Parameters
+    ----------
+    include: str
+        When set, only the interfaces with names matching this regex
+
+    exclude: str
+        When set, exclude the interfaces with names matching this regex
+
+    types: tuple
+        When set, only the interfaces of these types
+    """
+
+    def __init__(
+        self,
+        include: Optional[str] = None,
+        exclude: Optional[str] = None,
+        types: Optional[Tuple[str, ...]] = None,
+    ):
+        self.include = re.compile(include) if include else None
+        self.exclude = re.compile(exclude) if exclude else None
+        self.types = frozenset(types) if types else None
+        self._selected: Dict[str, bool] = dict()
+
+    def _select(self, if_name: str) -> bool:
+        if self.include and not self.include.search(if_name):
+            return False
+
+        if self.exclude and self.exclude.search(if_name):
+            return False
+
+        if self.types and interface_type(if_name) not in self.types:
+            return False
+
+        return True
+
+    def __call__(self, if_name: str) -> bool:
+        """ returns True if the interface is selected """
+        if (selected := self._selected.get(if_name)) is None:
+            selected = self._selected[if_name] = self._select(if_name)
+
+        return selected
+
+
+_filters: Dict[Tuple, InterfaceFilter] = dict()
+
+
+def interface_filter(config) -> Optional[InterfaceFilter]:
+    """
+    Returns the interface filter of the interfaces collector configuration, or
+    None if no filter is configured.  The filter is compiled once, and shared
+    by all devices with the same configuration.
+    """
+    key = (config.if_include, config.if_exclude, tuple(config.if_types or ()))
+    if not any(key):
+        return None
+
+    if (flt := _filters.get(key)) is None:
+        flt = _filters[key] = InterfaceFilter(*key)
+
+    return flt
+
+
+def show_interface(command: str, config) -> str:
+    """
+    Returns the show interface command, with config.if_range when set.
+    """
+    return f"{command} {config.if_range}" if config.if_range else command
+
+
+def filter_eapi(flt: InterfaceFilter, output: Dict) -> Dict:
+    """ filter the EAPI "show interfaces" output, in place """
+    ifs = output["interfaces"]
+    output["interfaces"] = {name: data for name, data in ifs.items() if flt(name)}
+    return output
+
+
+def filter_nxos(flt: InterfaceFilter, xml):
+    """ filter the NX-OS "show interface" XML, in place """
+    for rec in xml.xpath("TABLE_interface/ROW_interface"):
+        if not flt(rec.findtext("interface")):
+            rec.getparent().remove(rec)
+
+    return xml
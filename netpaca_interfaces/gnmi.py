@@ -0,0 +1,146 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the gNMI streaming telemetry support that is shared by the
+streaming variants of the interfaces collector (`eapi_gnmi`, `nxapi_gnmi`).
+
+The device driver is expected to provide a `gnmi` attribute whose `subscribe`
+method returns an async iterator of notification dictionaries, for example:
+
+    {
+        "timestamp": 1594312345000000000,
+        "update": [
+            {"path": "interfaces/interface[name=Ethernet1]/state/oper-status",
+             "val": "UP"}
+        ],
+        "delete": []
+    }
+
+Any client that honors this contract can be used, including one connected to a
+local stand-in gNMI server.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Dict
+import asyncio
+import re
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = ["SUBSCRIBE_PATHS", "apply_notification", "run_subscription"]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+SUBSCRIBE_PATHS = [
+    "/interfaces/interface/state/oper-status",
+    "/interfaces/interface/state/last-change",
+    "/interfaces/interface/state/description",
+]
+
+# the number of seconds to wait before re-establishing a failed subscription.
+_RESUBSCRIBE_DELAY = 10
+
+_re_if_path = re.compile(
+    r"interfaces/interface\[name=(?P<if_name>[^\]]+)\]/state/(?P<leaf>[\w-]+)$"
+)
+
+
+def apply_notification(store: Dict[str, Dict], notification: Dict) -> int:
+    """
+    Apply the updates and deletes of a single gNMI notification to the
+    interface store.  The store is keyed by interface name, and each value is a
+    dictionary of the OpenConfig state leaf values, for example:
+
+        {"Ethernet1": {"oper-status": "UP", "last-change": 1594..., "description": ""}}
+
+    Parameters
+    ----------
+    store: dict
+        The per-device interface store, updated in place.
+
+    notification: dict
+        The gNMI notification
+
+    Returns
+    -------
+    The number of interface leafs that were changed.
+    """
+    changed = 0
+
+    for update in notification.get("update") or []:
+        if not (mo := _re_if_path.search(update["path"])):
+            continue
+
+        leafs = store.setdefault(mo.group("if_name"), {})
+        leafs[mo.group("leaf")] = update["val"]
+        changed += 1
+
+    for path in notification.get("delete") or []:
+        if not (mo := _re_if_path.search(path)):
+            continue
+
+        if (leafs := store.get(mo.group("if_name"))) is None:
+            continue
+
+        leafs.pop(mo.group("leaf"), None)
+        if not leafs:
+            del store[mo.group("if_name")]
+
+        changed += 1
+
+    return changed
+
+
+async def run_subscription(device, store: Dict[str, Dict]):
+    """
+    This coroutine maintains the ON_CHANGE subscription to the device for the
+    lifetime of the collector, applying each notification to the interface
+    store.  If the subscription fails then it will be re-established after a
+    short delay.
+
+    Parameters
+    ----------
+    device:
+        The device driver instance that provides the `gnmi` client.
+
+    store: dict
+        The per-device interface store, updated in place.
+    """
+    while True:
+        try:
+            async for notification in device.gnmi.subscribe(
+                paths=SUBSCRIBE_PATHS, mode="on_change"
+            ):
+                apply_notification(store, notification)
+
+        except asyncio.CancelledError:
+            raise
+
+        except Exception as exc:  # noqa
+            device.log.error(
+                f"{device.name}: gNMI subscription failed: {exc}, will try again."
+            )
+
+        await asyncio.sleep(_RESUBSCRIBE_DELAY)
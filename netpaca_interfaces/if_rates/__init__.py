@@ -0,0 +1,143 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the collctor definition for interface rates.
+"""
+
+from pydantic.dataclasses import dataclass
+from pydantic import Field, BaseModel
+
+from netpaca import Metric
+from netpaca.collectors import CollectorType, CollectorConfigModel
+from netpaca.config_model import CollectorModel  # noqa
+
+from netpaca_interfaces import CollectorPollStatMetric
+
+# -----------------------------------------------------------------------------
+#
+#                              Collector Config
+# -----------------------------------------------------------------------------
+# Define the collector configuraiton options that the User can set in their
+# configuration file.
+# -----------------------------------------------------------------------------
+
+
+class IfRatesCollectorConfig(CollectorConfigModel):
+    """ interface rates collector configuration options """
+
+    link_up_only: bool = Field(
+        default=True, description="only report the rates of link-up interfaces"
+    )
+
+    instrument: bool = Field(
+        default=False,
+        description="emit the collector_poll_stats metrics for each poll",
+    )
+
+
+class IfRatesCollectorTags(BaseModel):
+    """ interface rate metric tags """
+
+    if_name: str = Field(description="interface name")
+    if_desc: str = Field(description="interface description")
+    direction: str = Field(description="traffic direction, in or out")
+
+
+# -----------------------------------------------------------------------------
+#
+#                              Metrics
+#
+# -----------------------------------------------------------------------------
+# This section defines the Metric types supported by the Interface Rates
+# Collector
+# -----------------------------------------------------------------------------
+
+
+@dataclass
+class IfBitRateMetric(Metric):
+    """ Interface bits per second """
+
+    value: float
+    name: str = "if_bps"
+
+
+@dataclass
+class IfPacketRateMetric(Metric):
+    """ Interface packets per second """
+
+    value: float
+    name: str = "if_pps"
+
+
+@dataclass
+class IfErrorRateMetric(Metric):
+    """ Interface errors per second """
+
+    value: float
+    name: str = "if_errors_ps"
+
+
+@dataclass
+class IfDiscardRateMetric(Metric):
+    """ Interface discards per second """
+
+    value: float
+    name: str = "if_discards_ps"
+
+
+# -----------------------------------------------------------------------------
+#
+#                              Collector Definition
+#
+# -----------------------------------------------------------------------------
+
+
+class IfRatesCollectorType(CollectorType):
+    """
+    This class defines the Interface Rates collector specification.  This class
+    is "registered" with the "netpaca.collectors" entry_point group via the
+    `setup.py` file.  As a result of this registration, a User of the netpaca
+    tool can setup their configuration file with the "use" statement.
+
+    The rates are computed from the interface counters of consecutive polls of
+    the `interfaces` collector, so there are no additional device requests.
+
+    Examples (Configuration File)
+    -----------------------------
+    [collectors.if_rates]
+        use = "netpaca.collectors:if_rates"
+    """
+
+    name = "if-rates"
+    description = """
+Used to collect interface bit, packet, error, and discard rates
+"""
+    config = IfRatesCollectorConfig
+    tags: IfRatesCollectorTags
+    metrics = [
+        IfBitRateMetric,
+        IfPacketRateMetric,
+        IfErrorRateMetric,
+        IfDiscardRateMetric,
+        CollectorPollStatMetric,
+    ]
+
+
+# create an "alias" variable so that the device specific collector packages
+# can register their start functions.
+
+name = IfRatesCollectorType.name
+register = IfRatesCollectorType.start.register
@@ -0,0 +1,175 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the interface rate computation from the counters of
+consecutive interfaces collector polls.
+
+The counters of each interface are extracted by the platform module as an
+`IfCounters` tuple.  The counters of the prior poll are stored in the device
+private area as "if_rates", and the rates are the counter deltas divided by
+the time between the polls.
+
+A counter that decreased is either a 32-bit counter that wrapped, when the
+prior value was in the upper half of the 32-bit range, or a counter that was
+reset (cleared, or the device reloaded).  No rate is reported for a reset
+counter; the current value is the baseline for the next poll.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Optional, List, Dict, NamedTuple
+
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+from netpaca import Metric
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca_interfaces import if_rates
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = ["IfCounters", "counter_delta", "is_new", "rate_metrics"]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+_MAX_COUNTER32 = 2 ** 32
+
+
+class IfCounters(NamedTuple):
+    """ the interface counters used for the rates """
+
+    link_up: bool
+    desc: str
+    in_octets: int
+    out_octets: int
+    in_pkts: int
+    out_pkts: int
+    in_errors: int
+    out_errors: int
+    in_discards: int
+    out_discards: int
+
+
+# the counter fields, the rate metric type and direction, and the multiplier
+# applied to the per-second delta.
+
+_RATES = [
+    ("in_octets", if_rates.IfBitRateMetric, "in", 8),
+    ("out_octets", if_rates.IfBitRateMetric, "out", 8),
+    ("in_pkts", if_rates.IfPacketRateMetric, "in", 1),
+    ("out_pkts", if_rates.IfPacketRateMetric, "out", 1),
+    ("in_errors", if_rates.IfErrorRateMetric, "in", 1),
+    ("out_errors", if_rates.IfErrorRateMetric, "out", 1),
+    ("in_discards", if_rates.IfDiscardRateMetric, "in", 1),
+    ("out_discards", if_rates.IfDiscardRateMetric, "out", 1),
+]
+
+
+def counter_delta(prev: int, curr: int) -> Optional[int]:
+    """
+    Returns the increase of the counter from the prior value, handling a
+    32-bit counter wrap; or None if the counter was reset.
+    """
+    if curr >= prev:
+        return curr - prev
+
+    if _MAX_COUNTER32 // 2 <= prev < _MAX_COUNTER32:
+        return curr + _MAX_COUNTER32 - prev
+
+    return None
+
+
+def is_new(device, poll_ts: float) -> bool:
+    """
+    Returns True if the interfaces collector data, collected at poll_ts, has
+    not yet been used for the rates.
+    """
+    return (prev := device.private.get("if_rates")) is None or prev["ts"] != poll_ts
+
+
+def rate_metrics(
+    device, poll_ts: float, counters: Dict[str, IfCounters], ts, config
+) -> Optional[List[Metric]]:
+    """
+    Returns the interface rate metrics given the counters of the current
+    interfaces collector poll, and stores the counters for the next poll.
+
+    Parameters
+    ----------
+    device:
+        The device driver instance
+
+    poll_ts: float
+        The time the counters were collected, seconds since epoch
+
+    counters: dict
+        The counters keyed by interface name
+
+    ts:
+        The metric timestamp
+
+    config: IfRatesCollectorConfig
+        The collector configuration options
+
+    Returns
+    -------
+    The list of metrics, or None if this is the first poll.
+    """
+    prev = device.private.get("if_rates")
+    device.private["if_rates"] = {"ts": poll_ts, "counters": counters}
+
+    if not prev or (elapsed := poll_ts - prev["ts"]) <= 0:
+        return None
+
+    prev_counters = prev["counters"]
+    metrics = list()
+
+    for if_name, curr in counters.items():
+        if config.link_up_only and not curr.link_up:
+            continue
+
+        if (prev_if := prev_counters.get(if_name)) is None:
+            continue
+
+        for field, metric_cls, direction, mult in _RATES:
+            delta = counter_delta(getattr(prev_if, field), getattr(curr, field))
+            if delta is None:
+                continue
+
+            metrics.append(
+                metric_cls(
+                    value=round(delta * mult / elapsed, 3),
+                    ts=ts,
+                    tags=dict(
+                        if_name=if_name, if_desc=curr.desc, direction=direction
+                    ),
+                )
+            )
+
+    return metrics
@@ -0,0 +1,183 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the interface rates collector for Arista EOS systems, using
+the "interfaceCounters" of the EAPI "show interfaces" output collected by the
+`interfaces` collector.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Optional, List, Dict
+
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+from netpaca import Metric, MetricTimestamp
+from netpaca.collectors.executor import CollectorExecutor
+from netpaca.drivers.eapi import Device
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca_interfaces import if_rates, instrument, sharding
+from netpaca_interfaces.if_rates.counters import IfCounters, is_new, rate_metrics
+
+# -----------------------------------------------------------------------------
+# Exports (none)
+# -----------------------------------------------------------------------------
+
+__all__ = []
+
+
+# -----------------------------------------------------------------------------
+#
+#                                 CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#
+#                     Register Arista Device to Colletor Type
+#
+# -----------------------------------------------------------------------------
+
+
+@if_rates.register
+async def start(
+    device: Device, executor: CollectorExecutor, spec: if_rates.CollectorModel,
+):
+    """
+    The interface rates collector start coroutine for Arista EOS devices.
+
+    Parameters
+    ----------
+    device:
+        The device driver instance for the Arista device
+
+    executor:
+        The executor that is used to start one or more collector tasks. In this
+        instance, there is only one collector task started per device.
+
+    spec:
+        The collector model instance that contains information about the
+        collector; for example the collector configuration values.
+    """
+    # in the sharded run mode, the collector is only started for the devices
+    # owned by this worker process.
+
+    if not sharding.owns(device):
+        return
+
+    device.log.info(f"{device.name}: Starting Arista EOS interface rates collector")
+    executor.start(
+        # required args
+        spec=spec,
+        coro=get_if_rates,
+        device=device,
+        # kwargs to collector coroutine:
+        config=spec.config,
+    )
+
+
+# -----------------------------------------------------------------------------
+#
+#                             Collector Coroutine
+#
+# -----------------------------------------------------------------------------
+
+
+def eos_counters(eos_data: Dict[str, Dict]) -> Dict[str, IfCounters]:
+    """ returns the interface counters from the EAPI "show interfaces" data """
+    counters = dict()
+
+    for if_name, if_data in eos_data.items():
+
+        # not all interfaces have counters, for example Vlan interfaces.
+        if not (if_cntrs := if_data.get("interfaceCounters")):
+            continue
+
+        counters[if_name] = IfCounters(
+            link_up=if_data["interfaceStatus"] == "connected",
+            desc=if_data.get("description", ""),
+            in_octets=if_cntrs.get("inOctets", 0),
+            out_octets=if_cntrs.get("outOctets", 0),
+            in_pkts=(
+                if_cntrs.get("inUcastPkts", 0)
+                + if_cntrs.get("inMulticastPkts", 0)
+                + if_cntrs.get("inBroadcastPkts", 0)
+            ),
+            out_pkts=(
+                if_cntrs.get("outUcastPkts", 0)
+                + if_cntrs.get("outMulticastPkts", 0)
+                + if_cntrs.get("outBroadcastPkts", 0)
+            ),
+            in_errors=if_cntrs.get("totalInErrors", 0),
+            out_errors=if_cntrs.get("totalOutErrors", 0),
+            in_discards=if_cntrs.get("inDiscards", 0),
+            out_discards=if_cntrs.get("outDiscards", 0),
+        )
+
+    return counters
+
+
+@instrument.instrumented(if_rates.name)
+async def get_if_rates(
+    device: Device, timestamp: MetricTimestamp, config: if_rates.IfRatesCollectorConfig
+) -> Optional[List[Metric]]:
+    """
+    This coroutine is used to create the interface rate metrics for Arista EOS
+    systems.
+
+    Parameters
+    ----------
+    device:
+        The Arisa EOS device driver instance for this device.
+
+    timestamp: MetricTimestamp
+        The timestamp now in milliseconds
+
+    config:
+        The collector configuration options
+    """
+
+    # wait for the interfaces collector to indicate that the data is available
+    # for processing.
+
+    interfaces = device.private["interfaces"]
+
+    with instrument.phase("event_wait"):
+        await interfaces["event"].wait()
+
+    # the interfaces collector indicates the data is not available when the
+    # device is failing; do not report metrics from stale data.
+
+    if not interfaces.get("available", True):
+        return None
+
+    # the rates are only computed once for each interfaces collector poll.
+
+    if not is_new(device, poll_ts := interfaces["maya_ts"].datetime().timestamp()):
+        return None
+
+    counters = eos_counters(interfaces["data"]["interfaces"])
+    instrument.record("interface_count", len(counters))
+
+    return rate_metrics(device, poll_ts, counters, interfaces["ts"], config)
@@ -0,0 +1,177 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the interface rates collector for Cisco NX-OS systems,
+using the "eth_" counters of the "show interface" XML collected by the
+`interfaces` collector.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Optional, List, Dict
+
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+from netpaca import Metric, MetricTimestamp
+from netpaca.collectors.executor import CollectorExecutor
+from netpaca.drivers.nxapi import Device
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca_interfaces import if_rates, instrument, sharding
+from netpaca_interfaces.if_rates.counters import IfCounters, is_new, rate_metrics
+
+# -----------------------------------------------------------------------------
+# Exports (none)
+# -----------------------------------------------------------------------------
+
+__all__ = []
+
+
+# -----------------------------------------------------------------------------
+#
+#                                 CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#
+#                     Register Cisco Device to Colletor Type
+#
+# -----------------------------------------------------------------------------
+
+
+@if_rates.register
+async def start(
+    device: Device, executor: CollectorExecutor, spec: if_rates.CollectorModel
+):
+    """
+    The interface rates collector start coroutine for Cisco NX-API enabled
+    devices.
+
+    Parameters
+    ----------
+    device:
+        The device driver instance for the Cisco device
+
+    executor:
+        The executor that is used to start one or more collector tasks. In this
+        instance, there is only one collector task started per device.
+
+    spec:
+        The collector model instance that contains information about the
+        collector; for example the collector configuration values.
+    """
+    # in the sharded run mode, the collector is only started for the devices
+    # owned by this worker process.
+
+    if not sharding.owns(device):
+        return
+
+    device.log.info(f"{device.name}: Starting Cisco NXAPI interface rates collector")
+
+    executor.start(
+        # required args
+        spec=spec,
+        coro=get_if_rates,
+        device=device,
+        # kwargs to collector coroutine:
+        config=spec.config,
+    )
+
+
+# -----------------------------------------------------------------------------
+#
+#                             Collector Coroutine
+#
+# -----------------------------------------------------------------------------
+
+
+def _count(rec, tag: str) -> int:
+    return int(rec.findtext(tag) or 0)
+
+
+def nxos_counters(interfaces_xml) -> Dict[str, IfCounters]:
+    """ returns the interface counters from the NX-OS "show interface" XML """
+
+    # only the ethernet and port-channel interfaces have the eth_ counters.
+
+    return {
+        rec.findtext("interface"): IfCounters(
+            link_up=rec.findtext("state") == "up",
+            desc=rec.findtext("desc") or "",
+            in_octets=_count(rec, "eth_inbytes"),
+            out_octets=_count(rec, "eth_outbytes"),
+            in_pkts=_count(rec, "eth_inpkts"),
+            out_pkts=_count(rec, "eth_outpkts"),
+            in_errors=_count(rec, "eth_inerr"),
+            out_errors=_count(rec, "eth_outerr"),
+            in_discards=_count(rec, "eth_indiscard"),
+            out_discards=_count(rec, "eth_outdiscard"),
+        )
+        for rec in interfaces_xml.xpath("TABLE_interface/ROW_interface[eth_inbytes]")
+    }
+
+
+@instrument.instrumented(if_rates.name)
+async def get_if_rates(
+    device: Device, timestamp: MetricTimestamp, config: if_rates.IfRatesCollectorConfig
+) -> Optional[List[Metric]]:
+    """
+    This coroutine is used to create the interface rate metrics for Cisco NX-OS
+    systems.
+
+    Parameters
+    ----------
+    device:
+        The Cisco device driver instance for this device.
+
+    timestamp: MetricTimestamp
+        The current timestamp
+
+    config:
+        The collector configuration options
+    """
+
+    # wait for the interfaces collector to indicate that the data is available
+    # for processing.
+
+    interfaces = device.private["interfaces"]
+
+    with instrument.phase("event_wait"):
+        await interfaces["event"].wait()
+
+    # the interfaces collector indicates the data is not available when the
+    # device is failing; do not report metrics from stale data.
+
+    if not interfaces.get("available", True):
+        return None
+
+    # the rates are only computed once for each interfaces collector poll.
+
+    if not is_new(device, poll_ts := interfaces["maya_ts"].datetime().timestamp()):
+        return None
+
+    counters = nxos_counters(interfaces["data"])
+    instrument.record("interface_count", len(counters))
+
+    return rate_metrics(device, poll_ts, counters, interfaces["ts"], config)
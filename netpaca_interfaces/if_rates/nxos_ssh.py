@@ -0,0 +1,90 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the interface rates collector for Cisco NX-OS devices using
+the SSH driver; the interfaces collector data is the same XML structure as
+NXAPI.
+"""
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+from netpaca.collectors.executor import CollectorExecutor
+from netpaca.drivers.nxos_ssh import Device
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca_interfaces import if_rates, sharding
+from netpaca_interfaces.if_rates.nxapi import get_if_rates
+
+# -----------------------------------------------------------------------------
+# Exports (none)
+# -----------------------------------------------------------------------------
+
+__all__ = []
+
+
+# -----------------------------------------------------------------------------
+#
+#                                CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#
+#                  Register Cisco Device SSH to Colletor Type
+#
+# -----------------------------------------------------------------------------
+
+
+@if_rates.register
+async def start(
+    device: Device, executor: CollectorExecutor, spec: if_rates.CollectorModel
+):
+    """
+    The interface rates collector start coroutine for Cisco NXOS SSH devices.
+
+    Parameters
+    ----------
+    device:
+        The device driver instance for the Cisco device
+
+    executor:
+        The executor that is used to start one or more collector tasks. In this
+        instance, there is only one collector task started per device.
+
+    spec:
+        The collector model instance that contains information about the
+        collector; for example the collector configuration values.
+    """
+    # in the sharded run mode, the collector is only started for the devices
+    # owned by this worker process.
+
+    if not sharding.owns(device):
+        return
+
+    device.log.debug(f"{device.name}: Starting Cisco NX-OS SSH if-rates collector")
+
+    executor.start(
+        # required args
+        spec=spec,
+        coro=get_if_rates,
+        device=device,
+        # kwargs to collector coroutine:
+        config=spec.config,
+    )
@@ -0,0 +1,151 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the self-instrumentation support shared by the collectors
+in this package.  A collector coroutine is decorated with `instrumented`, which
+creates a timing context for each poll.  The collector code marks its phases
+using `phase` and records values using `record`; when instrumentation is not
+enabled these are no-ops.  The wrapper adds the number of metrics emitted and
+returns the poll statistics as metrics along with the collector metrics.
+
+The wrapper is also the hook of the on-demand profiler, see `profiling`, and of
+the memory accounting of the collector outputs, see `memory`.
+
+Examples
+--------
+    @instrument.instrumented(interfaces.name)
+    async def get_interfaces(device, timestamp, config):
+        with instrument.phase("fetch"):
+            res = await device.eapi.exec(["show interfaces"])
+        ...
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Optional, List, Dict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+import time
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+import netpaca_interfaces as interfaces
+from netpaca_interfaces import profiling, memory
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = ["PollStats", "instrumented", "phase", "record"]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+
+class PollStats(object):
+    """
+    The statistics collected during a single collector poll.  Phase latencies
+    are stored as "<phase>_latency" in seconds.
+    """
+
+    def __init__(self, collector: str):
+        self.collector = collector
+        self.stats: Dict[str, float] = dict()
+
+    def metrics(self, timestamp) -> List[interfaces.CollectorPollStatMetric]:
+        return [
+            interfaces.CollectorPollStatMetric(
+                value=round(value, 6),
+                ts=timestamp,
+                tags=dict(collector=self.collector, stat=stat),
+            )
+            for stat, value in self.stats.items()
+        ]
+
+
+# the statistics of the poll running in the current task, if instrumented.
+_poll_stats: ContextVar[Optional[PollStats]] = ContextVar("poll_stats", default=None)
+
+
+@contextmanager
+def phase(name: str):
+    """
+    Context manager that records the elapsed time of the enclosed code as the
+    "<name>_latency" statistic.  The enclosed code may await.
+    """
+    if (stats := _poll_stats.get()) is None:
+        yield
+        return
+
+    t_start = time.perf_counter()
+    try:
+        yield
+    finally:
+        key = f"{name}_latency"
+        stats.stats[key] = stats.stats.get(key, 0.0) + time.perf_counter() - t_start
+
+
+def record(stat: str, value: float):
+    """ record a statistic value for the current poll """
+    if (stats := _poll_stats.get()) is not None:
+        stats.stats[stat] = value
+
+
+def instrumented(collector: str):
+    """
+    Decorator for collector coroutines, enabled per-collector by the
+    `instrument` configuration option.  The coroutine must have the standard
+    collector signature (device, timestamp, config).
+    """
+
+    def decorator(coro):
+        async def run(device, timestamp, config):
+            if not config.instrument:
+                return await coro(device, timestamp, config)
+
+            stats = PollStats(collector)
+            token = _poll_stats.set(stats)
+
+            try:
+                with phase("poll"):
+                    metrics = await coro(device, timestamp, config)
+            finally:
+                _poll_stats.reset(token)
+
+            stats.stats["metrics_emitted"] = len(metrics or [])
+            return (metrics or []) + stats.metrics(timestamp)
+
+        @wraps(coro)
+        async def wrapper(device, timestamp, config):
+            if (session := profiling.session_for(collector, device)) is None:
+                metrics = await run(device, timestamp, config)
+            else:
+                with session.profile():
+                    metrics = await run(device, timestamp, config)
+
+            return memory.account(collector, device, config, metrics, timestamp)
+
+        return wrapper
+
+    return decorator
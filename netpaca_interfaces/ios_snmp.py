@@ -30,25 +30,18 @@ import os
 # Public Imports
 # -----------------------------------------------------------------------------
 
-import maya
-
-from pysnmp.hlapi.asyncio import (
-    SnmpEngine,
-    CommunityData
-)
-
 from netpaca import Metric, MetricTimestamp
 from netpaca.collectors.executor import CollectorExecutor
 from netpaca.config_model import CollectorModel
 from netpaca.drivers.ios_ssh import Device
-from netpaca.aiosnmp.system import get_sys_uptime, get_snmpengine_uptime
-import netpaca.aiosnmp.interfaces as aio_snmp_ifs
 
 # -----------------------------------------------------------------------------
 # Private Imports
 # -----------------------------------------------------------------------------
 
 import netpaca_interfaces as interfaces
+from netpaca_interfaces import polling, instrument, replay, sharding, snapshot
+from netpaca_interfaces import filters
 
 # -----------------------------------------------------------------------------
 # Exports (none)
@@ -91,6 +84,14 @@ async def start(device: Device, executor: CollectorExecutor, spec: CollectorMode
         The collector model instance that contains information about the
         collector; for example the collector configuration values.
     """
+    from pysnmp.hlapi.asyncio import SnmpEngine, CommunityData
+
+    # in the sharded run mode, the collector is only started for the devices
+    # owned by this worker process.
+
+    if not sharding.owns(device):
+        return
+
     device.log.info(f"{device.name}: Starting Cisco IOS interfaces collector")
 
     device.private['pysnmp'] = dict(
@@ -98,7 +99,15 @@ async def start(device: Device, executor: CollectorExecutor, spec: CollectorMode
         community=CommunityData(os.environ['SNMP_COMMUNITY'])
     )
 
-    device.private["interfaces"] = {"event": asyncio.Event()}
+    device.private["interfaces"] = {
+        "event": asyncio.Event(),
+        "poll": polling.adaptive_poll(spec.config),
+        "breaker": polling.circuit_breaker(spec.config),
+    }
+
+    # when replay is enabled, the device responses are served from the recorded
+    # capture file rather than the device.
+    replay.attach(device, spec.config)
 
     executor.start(
         # required args
@@ -117,6 +126,7 @@ async def start(device: Device, executor: CollectorExecutor, spec: CollectorMode
 # -----------------------------------------------------------------------------
 
 
+@instrument.instrumented(interfaces.name)
 async def get_interfaces(
     device: Device, timestamp: MetricTimestamp, config  # noqa
 ) -> Optional[List[Metric]]:
@@ -135,10 +145,98 @@ async def get_interfaces(
     config:
         The collector configuration options
     """
+    import maya
+
+    # when adaptive polling is enabled, skip this collection interval if the
+    # device is currently backed off.
+
+    if (poll := device.private["interfaces"]["poll"]) and not poll.should_poll():
+        return None
+
+    # when the circuit breaker is open, skip polling the failing device.
+
+    if (breaker := device.private["interfaces"]["breaker"]) and not breaker.allow():
+        return None
+
+    # in the cluster mode, only poll the devices owned by this node.
+
+    if not sharding.cluster_owns(device):
+        return None
+
     community = os.environ["SNMP_COMMUNITY"]
-    sys_uptime = device.private['orig_sys_uptime'] = await get_sys_uptime(device=device)
 
-    snmp_uptime = await get_snmpengine_uptime(device=device)
+    # collect the SNMP values and tables that are needed for this collector.
+    # The table walks that complete within the poll deadline are used to
+    # produce a partial snapshot; the interface name table is required.
+
+    deadline = polling.PollDeadline(config)
+
+    try:
+        async with polling.poll_slot(device, config):
+            with instrument.phase("fetch"):
+                if replayed := device.private.get("replay"):
+                    snmp = await deadline.fetch(replayed.snmp())
+                    sys_uptime, snmp_uptime = snmp["sys_uptime"], snmp["snmp_uptime"]
+                    if_tables = snmp["tables"]
+                else:
+                    from netpaca.aiosnmp.system import (
+                        get_sys_uptime,
+                        get_snmpengine_uptime,
+                    )
+                    import netpaca.aiosnmp.interfaces as aio_snmp_ifs
+
+                    sys_uptime = await deadline.fetch(get_sys_uptime(device=device))
+                    snmp_uptime = await deadline.fetch(
+                        get_snmpengine_uptime(device=device)
+                    )
+                    if_tables = await deadline.fetch_partial(
+                        aio_snmp_ifs.get_if_name_table(device),
+                        aio_snmp_ifs.get_if_alias_table(device),
+                        aio_snmp_ifs.get_if_operstatus_table(device),
+                        aio_snmp_ifs.get_if_lastchange_table(device),
+                    )
+
+    except polling.PollShed:
+        return polling.poll_shed(device, timestamp)
+
+    except asyncio.TimeoutError:
+        device.log.error(
+            f"{device.name}: interface data not received within "
+            f"{deadline.fetch_timeout}s, will try again."
+        )
+        polling.poll_failed(device)
+        return deadline.overrun(timestamp, "fetch")
+
+    except Exception as exc:  # noqa
+        device.log.error(
+            f"{device.name}: unable to obtain interface data: {exc}, will try again."
+        )
+        polling.poll_failed(device)
+        return None
+
+    if (if_names := if_tables[0]) is None:
+        device.log.error(
+            f"{device.name}: interface names not received within "
+            f"{deadline.fetch_timeout}s, will try again."
+        )
+        polling.poll_failed(device)
+        return deadline.overrun(timestamp, "fetch")
+
+    overruns = deadline.overrun(timestamp, "fetch")
+
+    if deadline.partial:
+        device.log.warning(f"{device.name}: partial interface data, deadline exceeded")
+    else:
+        replay.capture(
+            device,
+            config,
+            deadline.elapsed,
+            snmp=dict(
+                sys_uptime=sys_uptime, snmp_uptime=snmp_uptime, tables=if_tables
+            ),
+        )
+
+    device.private['orig_sys_uptime'] = sys_uptime
 
     dev_uptime_wrapped = ((snmp_uptime * 100) // _MAX_INT_UPTIME) if snmp_uptime else 0
 
@@ -153,31 +251,48 @@ async def get_interfaces(
     device.private["sys_uptime"] = sys_uptime
     device.private["sys_uptime_wrapped"] = dev_uptime_wrapped
 
-    # colelct the SNMP tables that are needed for this collector
-
-    if_tables = await asyncio.gather(
-        aio_snmp_ifs.get_if_name_table(device),
-        aio_snmp_ifs.get_if_alias_table(device),
-        aio_snmp_ifs.get_if_operstatus_table(device),
-        aio_snmp_ifs.get_if_lastchange_table(device),
-    )
-
     if_table_keys = ["if_name", "if_desc", "if_link_up", "if_lastchange"]
 
     # transmultate the tables into a dictionary for use by the other collectors.
+    # The values of any table that was not collected are None.  The interfaces
+    # not selected by the configured filter are excluded.
 
-    interface_data = {
-        rec["if_name"]: rec
-        for if_data in zip(*map(dict.values, if_tables))
-        for rec in [dict(zip(if_table_keys, if_data))]
-    }
+    flt = filters.interface_filter(config)
+
+    with instrument.phase("parse"):
+        if_columns = [
+            table.values() if table is not None else [None] * len(if_names)
+            for table in if_tables
+        ]
+
+        interface_data = {
+            rec["if_name"]: rec
+            for if_data in zip(*if_columns)
+            if flt is None or flt(if_data[0])
+            for rec in [dict(zip(if_table_keys, if_data))]
+        }
+
+    instrument.record("interface_count", len(interface_data))
+
+    if snapshot.wanted(device, config):
+        snapshot.store(device, config, snapshot.normalize_ios(interface_data))
 
     device.private["interfaces"].update(
-        {"ts": timestamp, "maya_ts": maya.now(), "data": interface_data}
+        {
+            "ts": timestamp,
+            "maya_ts": maya.now(),
+            "data": interface_data,
+            "partial": deadline.partial,
+        }
     )
 
+    polling.poll_succeeded(device)
+
     # trigger the pending tasks to awake to process the data.
     device.private["interfaces"]["event"].set()
 
-    # no metrics to export, so return None.
-    return None
+    if poll:
+        poll.polled()
+
+    # report overruns of the poll deadline, if any.
+    return overruns + deadline.overrun(timestamp, "parse") or None
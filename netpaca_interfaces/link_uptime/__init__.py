@@ -17,7 +17,7 @@
 This file contains the collctor definition for monitoring link flaps.
 """
 
-from typing import Optional
+from typing import Optional, Literal
 from pydantic.dataclasses import dataclass
 from pydantic import Field, BaseModel
 
@@ -25,6 +25,8 @@ from netpaca import Metric
 from netpaca.collectors import CollectorType, CollectorConfigModel
 from netpaca.config_model import CollectorModel  # noqa
 
+from netpaca_interfaces import CollectorPollStatMetric
+
 # -----------------------------------------------------------------------------
 #
 #                              Collector Config
@@ -45,12 +47,83 @@ $uptime_threshold minutes.  For example 1 day is 3_840 minutes.
 """,
     )
 
+    instrument: bool = Field(
+        default=False,
+        description="emit the collector_poll_stats metrics for each poll",
+    )
+
+    vectorize: bool = Field(
+        default=False,
+        description="""\
+Compute the link uptimes with NumPy array operations, when installed, for
+devices with a large number of interfaces (EOS and IOS).
+""",
+    )
+
+    batch_interval: Optional[int] = Field(
+        default=None,
+        description="""\
+Compute the link uptime metrics of all devices in a single batch every
+$batch_interval milliseconds (for example 500), rather than in each device
+collector task.
+""",
+    )
+
+    desc_tag: bool = Field(
+        default=True,
+        description="""\
+Include the interface description as the if_desc tag of the link uptime
+metrics.  When false, the description is instead reported by the
+interface_desc metric when it changes, so that editing a description does not
+create a new link uptime series.
+""",
+    )
+
+    bundles: bool = Field(
+        default=False,
+        description="""\
+Report the port-channel aggregates of the member link uptimes, as the
+bundle_uptime and bundle_members_up metrics (EOS and NX-OS).
+""",
+    )
+
+    spool_max: Optional[int] = Field(
+        default=None,
+        description="""\
+Enables the metric spool, holding at most $spool_max metrics across all devices
+while the exporter is behind; see `link_uptime/spool.py`.
+""",
+    )
+
+    spool_inflight: int = Field(
+        default=100_000,
+        description="""\
+The number of metrics handed to the exporter and not yet exported, above which
+the metrics are spooled.
+""",
+    )
+
+    spool_policy: Literal["coalesce", "drop_oldest", "drop_newest"] = Field(
+        default="coalesce",
+        description="""\
+When the spool is full, "coalesce" keeps only the latest metric per interface
+and drops the oldest; "drop_oldest" or "drop_newest" drop a metric.
+""",
+    )
+
+    spool_path: Optional[str] = Field(
+        default=None,
+        description="the SQLite database file of the spool, rather than memory",
+    )
+
 
 class LinkUptimeCollectorTags(BaseModel):
     """ link uptime metric tags """
 
     if_name: str = Field(description="interface name")
-    if_desc: str = Field(description="interface description")
+    if_desc: Optional[str] = Field(
+        description="interface description, unless config.desc_tag is false"
+    )
 
 
 # -----------------------------------------------------------------------------
@@ -70,6 +143,44 @@ class LinkUptimeMetric(Metric):
     name: str = "linkflap_uptime"
 
 
+@dataclass
+class InterfaceDescriptionMetric(Metric):
+    """
+    Interface description, reported with the if_name and if_desc tags when
+    the description changes (config.desc_tag false).  The value is always 1.
+    """
+
+    value: int
+    name: str = "interface_desc"
+
+
+@dataclass
+class BundleUptimeMetric(Metric):
+    """ Port-channel smallest link uptime of the link-up members, in minutes """
+
+    value: int
+    name: str = "bundle_uptime"
+
+
+@dataclass
+class BundleMembersUpMetric(Metric):
+    """ Port-channel number of link-up members """
+
+    value: int
+    name: str = "bundle_members_up"
+
+
+@dataclass
+class SpoolStatMetric(Metric):
+    """
+    Link uptime metric spool statistics of the device, with the "stat" tag:
+    "depth" (spooled metrics), "dropped" and "coalesced" (counters).
+    """
+
+    value: int
+    name: str = "link_uptime_spool"
+
+
 # -----------------------------------------------------------------------------
 #
 #                              Collector Definition
@@ -96,7 +207,14 @@ Used to collect interface uptime (last flap) metrics
 """
     config = LinkUptimeCollectorConfig
     tags: LinkUptimeCollectorTags
-    metrics = [LinkUptimeMetric]
+    metrics = [
+        LinkUptimeMetric,
+        InterfaceDescriptionMetric,
+        BundleUptimeMetric,
+        BundleMembersUpMetric,
+        SpoolStatMetric,
+        CollectorPollStatMetric,
+    ]
 
 
 # create an "alias" variable so that the device specific collector packages
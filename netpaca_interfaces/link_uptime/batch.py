@@ -0,0 +1,112 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the cross-device batch stage of the link uptime collectors.
+
+When the link_uptime config.batch_interval is set, the link uptime metrics of
+a device are not computed by its collector task.  The collector task instead
+submits the computation to a shared queue, and a single worker task computes
+the metrics of all the devices ready in the queue, in one pass, every
+batch_interval milliseconds.  The collector tasks of the batch then complete
+together, so that the metrics are handed to the exporter in the same event
+loop iteration.  The computations of a batch are run in order of the device
+priority tier, see `polling.priority_tier`.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Optional, Callable, List, Tuple, Dict
+import asyncio
+
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+from netpaca import Metric
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = ["BatchStage", "run"]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+Compute = Callable[[], List[Metric]]
+
+
+class BatchStage(object):
+    """
+    The shared queue of link uptime computations, run by a single worker task.
+
+    Parameters
+    ----------
+    interval: float
+        The number of seconds between batches
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._pending: List[Tuple[int, Compute, asyncio.Future]] = list()
+        self._task: Optional[asyncio.Task] = None
+
+    async def submit(self, compute: Compute, tier: int = 0) -> List[Metric]:
+        """ returns the metrics from the computation, once run by the worker """
+        done = asyncio.get_running_loop().create_future()
+        self._pending.append((tier, compute, done))
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+        return await done
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            batch, self._pending = self._pending, list()
+            batch.sort(key=lambda item: item[0])
+
+            for _, compute, done in batch:
+                if done.cancelled():
+                    continue
+                try:
+                    done.set_result(compute())
+                except Exception as exc:
+                    done.set_exception(exc)
+
+
+_stages: Dict[int, BatchStage] = dict()
+
+
+async def run(config, compute: Compute, tier: int = 0) -> List[Metric]:
+    """
+    Returns the link uptime metrics from the computation, run by the batch
+    stage when config.batch_interval is set, or directly otherwise.  The tier is
+    the device priority tier.
+    """
+    if not (interval := config.batch_interval):
+        return compute()
+
+    if (stage := _stages.get(interval)) is None:
+        stage = _stages[interval] = BatchStage(interval / 1000)
+
+    return await stage.submit(compute, tier)
@@ -0,0 +1,94 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the port-channel aggregates of the link uptime collectors,
+enabled by the link_uptime config.bundles option.
+
+The device specific collectors find the members of each port-channel in the
+interfaces collector data (EOS "memberInterfaces", NX-OS "eth_bundle") and
+provide the uptimes of the link-up members.  For each port-channel the number
+of link-up members is reported as the bundle_members_up metric, and the
+smallest member uptime as the bundle_uptime metric; so that "has any member of
+Port-Channel10 flapped recently" is a single series.
+
+The member uptimes are not limited by config.uptime_threshold.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Optional, List, Dict
+
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+from netpaca import Metric
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca_interfaces import link_uptime
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = ["BundleUptimes", "bundle_metrics"]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+# the uptimes, in minutes, of the link-up members of each port-channel; None for
+# a member whose uptime is not known.
+
+BundleUptimes = Dict[str, List[Optional[int]]]
+
+
+def bundle_metrics(bundles: BundleUptimes, ts) -> List[Metric]:
+    """
+    Returns the port-channel aggregate metrics from the member uptimes.
+
+    Parameters
+    ----------
+    bundles: dict
+        The uptimes of the link-up members, by port-channel name
+
+    ts:
+        The timestamp when the interfaces were collected
+    """
+    metrics = list()
+
+    for if_name, uptimes in bundles.items():
+        metrics.append(
+            link_uptime.BundleMembersUpMetric(
+                value=len(uptimes), ts=ts, tags=dict(if_name=if_name)
+            )
+        )
+
+        if known := [uptime_min for uptime_min in uptimes if uptime_min is not None]:
+            metrics.append(
+                link_uptime.BundleUptimeMetric(
+                    value=min(known), ts=ts, tags=dict(if_name=if_name)
+                )
+            )
+
+    return metrics
@@ -0,0 +1,83 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the interface description handling of the link uptime
+collectors when config.desc_tag is false.
+
+The if_desc tag is removed from the link uptime metrics, and an
+`InterfaceDescriptionMetric` is added for each interface whose description
+changed since it was last reported.  The reported descriptions are cached in
+the device private area as "if_desc".
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import List
+
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+from netpaca import Metric
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca_interfaces import link_uptime
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = ["untag"]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+
+def untag(device, metrics: List[Metric], config) -> List[Metric]:
+    """
+    Returns the link uptime metrics without the if_desc tag, and the interface
+    description metrics for the changed descriptions; or the metrics unchanged
+    when config.desc_tag is true.
+    """
+    if config.desc_tag or not metrics:
+        return metrics
+
+    reported = device.private.setdefault("if_desc", dict())
+    changed = list()
+
+    for metric in metrics:
+        if_name = metric.tags["if_name"]
+        if_desc = metric.tags.pop("if_desc", None) or ""
+
+        if reported.get(if_name) == if_desc:
+            continue
+
+        reported[if_name] = if_desc
+        changed.append(
+            link_uptime.InterfaceDescriptionMetric(
+                value=1, ts=metric.ts, tags=dict(if_name=if_name, if_desc=if_desc)
+            )
+        )
+
+    return metrics + changed
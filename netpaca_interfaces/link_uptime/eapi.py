@@ -19,11 +19,11 @@
 # -----------------------------------------------------------------------------
 
 from typing import Optional, List
+from functools import partial
 
 # -----------------------------------------------------------------------------
 # Public Imports
 # -----------------------------------------------------------------------------
-import maya
 from netpaca import Metric, MetricTimestamp
 from netpaca.collectors.executor import CollectorExecutor
 from netpaca.drivers.eapi import Device
@@ -32,7 +32,8 @@ from netpaca.drivers.eapi import Device
 # Private Imports
 # -----------------------------------------------------------------------------
 
-from netpaca_interfaces import link_uptime
+from netpaca_interfaces import link_uptime, instrument, sharding
+from netpaca_interfaces.link_uptime import uptime, batch, descriptions, spool, bundles
 
 # -----------------------------------------------------------------------------
 # Exports (none)
@@ -75,6 +76,12 @@ async def start(
         The collector model instance that contains information about the
         collector; for example the collector configuration values.
     """
+    # in the sharded run mode, the collector is only started for the devices
+    # owned by this worker process.
+
+    if not sharding.owns(device):
+        return
+
     device.log.info(f"{device.name}: Starting Arista EOS link flaps collector")
     executor.start(
         # required args
@@ -93,10 +100,11 @@ async def start(
 # -----------------------------------------------------------------------------
 
 
+@instrument.instrumented(link_uptime.name)
 async def get_link_flaps(
     device: Device,
-    timestamp: MetricTimestamp,  # noqa - not used
-    config,  # noqa - not used
+    timestamp: MetricTimestamp,
+    config: link_uptime.LinkUptimeCollectorConfig,
 ) -> Optional[List[Metric]]:
     """
     This coroutine is used to create the link uptime metrics for Arista EOS
@@ -115,41 +123,121 @@ async def get_link_flaps(
         The collector configuration options
 
     """
+    import maya
 
     # wait for the interfaces collector to indicate that the data is available
     # for processing.
 
     interfaces = device.private["interfaces"]
-    await interfaces["event"].wait()
 
-    eos_data = interfaces["data"]["interfaces"]
-    ifs_ts = interfaces["ts"]
-    maya_now = interfaces["maya_ts"]
+    with instrument.phase("event_wait"):
+        await interfaces["event"].wait()
 
-    metrics = list()
+    # the interfaces collector indicates the data is not available when the
+    # device is failing; do not report metrics from stale data.
 
-    for if_name, if_data in eos_data.items():
+    if not interfaces.get("available", True):
+        return None
 
-        # skip interfaces that are not link-up
-        if if_data["interfaceStatus"] != "connected":
-            continue
+    instrument.record(
+        "snapshot_age", (maya.now() - interfaces["maya_ts"]).total_seconds()
+    )
+    instrument.record("interface_count", len(interfaces["data"]["interfaces"]))
+
+    # compute the metrics, in the cross-device batch stage when enabled; the
+    # batch is run in order of the device priority tier.
+
+    with instrument.phase("compute"):
+        metrics = await batch.run(
+            config,
+            partial(link_flap_metrics, device, interfaces, config),
+            tier=interfaces.get("tier", 0),
+        )
+
+    # provide the smallest link uptime to the interfaces collector so that
+    # adaptive polling (when enabled) tightens the schedule after a flap.
+
+    if (poll := interfaces.get("poll")) and metrics:
+        poll.observe(min(metric.value for metric in metrics))
+
+    # when the description is not a tag, report the description changes; then
+    # hold the metrics in the spool when the exporter is behind.
+
+    metrics = descriptions.untag(device, metrics, config)
+
+    # add the port-channel aggregates of the member link uptimes.
+
+    if config.bundles:
+        metrics += bundles.bundle_metrics(bundle_uptimes(interfaces), interfaces["ts"])
+
+    return spool.exchange(device, config, metrics, timestamp)
+
+
+def link_flap_metrics(
+    device: Device, interfaces: dict, config: link_uptime.LinkUptimeCollectorConfig
+) -> List[Metric]:
+    """
+    Returns the link uptime metrics from the Arista EOS interfaces collector data.
 
-        # EOS stores the value as an epoc timestamp (float).  We need to convert
-        # this to uptime in minutes.
+    Parameters
+    ----------
+    device:
+        The device driver instance
 
-        last_flapped = if_data["lastStatusChangeTimestamp"]
-        dt = maya.MayaDT(epoch=last_flapped)
-        uptime_min = (maya_now - dt).total_seconds() // 60
+    interfaces: dict
+        The device private "interfaces" area of the interfaces collector
 
-        # add metric tags for interface name and description
+    config:
+        The collector configuration options
+    """
+    eos_data = interfaces["data"]["interfaces"]
+    ifs_ts = interfaces["ts"]
 
-        tags = dict(if_name=if_name, if_desc=if_data["description"])
+    # EOS stores the last change value as an epoc timestamp (float).  We need
+    # to convert this to uptime in minutes, only for the interfaces that are
+    # link-up.
 
-        # create the link uptime metric using the timestamp when the interfaces
-        # where collected.
+    uptimes = uptime.eos_uptimes(
+        eos_data,
+        interfaces["maya_ts"].datetime().timestamp(),
+        threshold=config.uptime_threshold,
+        vectorize=config.vectorize,
+    )
 
-        metrics.append(
-            link_uptime.LinkUptimeMetric(value=uptime_min, ts=ifs_ts, tags=tags)
+    metrics = [
+        # create the link uptime metric, with tags for interface name and
+        # description, using the timestamp when the interfaces where collected.
+        link_uptime.LinkUptimeMetric(
+            value=uptime_min,
+            ts=ifs_ts,
+            tags=dict(if_name=if_name, if_desc=eos_data[if_name]["description"]),
         )
+        for if_name, uptime_min in uptimes
+    ]
 
     return metrics
+
+
+def bundle_uptimes(interfaces: dict) -> bundles.BundleUptimes:
+    """
+    Returns the uptimes of the link-up members of each port-channel from the
+    Arista EOS interfaces collector data.
+    """
+    eos_data = interfaces["data"]["interfaces"]
+    now = interfaces["maya_ts"].datetime().timestamp()
+    uptimes = dict()
+
+    for if_name, if_data in eos_data.items():
+        if (members := if_data.get("memberInterfaces")) is None:
+            continue
+
+        members_up = {
+            member: eos_data[member]
+            for member in members
+            if eos_data.get(member, {}).get("interfaceStatus") == "connected"
+        }
+
+        known = dict(uptime.eos_uptimes(members_up, now))
+        uptimes[if_name] = [known.get(member) for member in members_up]
+
+    return uptimes
@@ -25,11 +25,13 @@ Working with Cisco ifLastChange values:
 # -----------------------------------------------------------------------------
 
 from typing import Optional, List
+from functools import partial
 
 # -----------------------------------------------------------------------------
 # Public Imports
 # -----------------------------------------------------------------------------
 
+
 from netpaca import Metric, MetricTimestamp
 from netpaca.collectors.executor import CollectorExecutor
 from netpaca.drivers.ios_ssh import Device
@@ -38,7 +40,8 @@ from netpaca.drivers.ios_ssh import Device
 # Private Imports
 # -----------------------------------------------------------------------------
 
-from netpaca_interfaces import link_uptime
+from netpaca_interfaces import link_uptime, instrument, sharding
+from netpaca_interfaces.link_uptime import uptime, batch, descriptions, spool
 
 # -----------------------------------------------------------------------------
 #
@@ -73,6 +76,12 @@ async def start(
         The collector model instance that contains information about the
         collector; for example the collector configuration values.
     """
+    # in the sharded run mode, the collector is only started for the devices
+    # owned by this worker process.
+
+    if not sharding.owns(device):
+        return
+
     device.log.info(f"{device.name}: Starting Cisco SSH/SNMP linkflap uptime collector")
 
     executor.start(
@@ -92,10 +101,11 @@ async def start(
 # -----------------------------------------------------------------------------
 
 
+@instrument.instrumented(link_uptime.name)
 async def get_link_uptimes(
     device: Device,
-    timestamp: MetricTimestamp,  # noqa not used
-    config: link_uptime.LinkUptimeCollectorConfig,  # noqa
+    timestamp: MetricTimestamp,
+    config: link_uptime.LinkUptimeCollectorConfig,
 ) -> Optional[List[Metric]]:
     """
     This coroutine is the periodical interface uptime metrics collect for Cisco IOS
@@ -113,77 +123,87 @@ async def get_link_uptimes(
         The collector configuration as provided from the User configuration
         file.
     """
+    import maya
 
     # wait for the interfaces collector to indicate that the data is available
     # for processing.
 
     interfaces = device.private["interfaces"]
-    await interfaces["event"].wait()
 
-    # now process the collected interface data for link uptime ....
+    with instrument.phase("event_wait"):
+        await interfaces["event"].wait()
 
-    dev_uptime_wrapped = device.private["sys_uptime_wrapped"]
-    did_wrap = dev_uptime_wrapped > 0
-    ifs_data = interfaces["data"]
-    ifs_data_ts = interfaces["ts"]
-    sys_uptime = device.private["sys_uptime"]
-    orig_sys_uptime = device.private['orig_sys_uptime']
+    # the interfaces collector indicates the data is not available when the
+    # device is failing; do not report metrics from stale data.
 
-    metrics = list()
+    if not interfaces.get("available", True):
+        return None
 
-    for if_name, if_rec in ifs_data.items():
+    instrument.record(
+        "snapshot_age", (maya.now() - interfaces["maya_ts"]).total_seconds()
+    )
+    instrument.record("interface_count", len(interfaces["data"]))
 
-        # skip any interfaces that are not link-up
-        if if_rec["if_link_up"] is False:
-            continue
+    # compute the metrics, in the cross-device batch stage when enabled; the
+    # batch is run in order of the device priority tier.
 
-        # skip any interface that have ifLastChange == 0 (never)
-        if (if_lc := if_rec["if_lastchange"]) == 0:
-            continue
+    with instrument.phase("compute"):
+        metrics = await batch.run(
+            config,
+            partial(link_uptime_metrics, device, interfaces, config),
+            tier=interfaces.get("tier", 0),
+        )
 
-        # need to change scenarios where sysUpTime may have wrapped.  code
-        # lifted from Netdisco project per cited References.
-        orig_if_lc = if_lc
+    # provide the smallest link uptime to the interfaces collector so that
+    # adaptive polling (when enabled) tightens the schedule after a flap.
 
-        if did_wrap and if_lc < orig_sys_uptime:
-            # ambiguous: lastchange could be sysUptime before or after wrap
+    if (poll := interfaces.get("poll")) and metrics:
+        poll.observe(min(metric.value for metric in metrics))
 
-            if (sys_uptime > 30_000) and (if_lc < 30_000):
-                # uptime wrap more than 5min ago but lastchange within 5min
-                # assume lastchange was directly after boot -> no action
-                pass
+    # when the description is not a tag, report the description changes; then
+    # hold the metrics in the spool when the exporter is behind.
 
-            else:
-                # uptime wrap less than 5min ago or lastchange > 5min ago
-                # to be on safe side, assume lastchange after counter wrap
-                device.log.warning(
-                    f"{device.name}:{if_name} - correcting ifLastChange, "
-                    "assuming sysUpTime wrap"
-                )
-                if_lc += dev_uptime_wrapped * 2 ** 32
+    metrics = descriptions.untag(device, metrics, config)
+    return spool.exchange(device, config, metrics, timestamp)
 
-        # compute the interface uptime in minutes
 
-        if_uptime_m = (sys_uptime - if_lc) // 6_000
+def link_uptime_metrics(
+    device: Device, interfaces: dict, config: link_uptime.LinkUptimeCollectorConfig
+) -> List[Metric]:
+    """
+    Returns the link uptime metrics from the Cisco IOS interfaces collector
+    data.
 
-        if if_uptime_m < 0:
-            # should never get this error, but leaving this here just in case :-)
-            device.log.error(
-                f"{device.name}/{link_uptime.name}: negative time: {if_uptime_m}:\n"
-                f"dev_uptime_wrapped={dev_uptime_wrapped}, sys_uptime={sys_uptime}," 
-                f"orig_if_lc={orig_if_lc}, if_lc={if_lc}"
-            )
+    Parameters
+    ----------
+    device:
+        The device driver instance
+
+    interfaces: dict
+        The device private "interfaces" area of the interfaces collector
+
+    config:
+        The collector configuration options
+    """
+    # now process the collected interface data for link uptime ....
 
+    ifs_data = interfaces["data"]
+    ifs_data_ts = interfaces["ts"]
+
+    metrics = [
         # add the metric with tags and use the timestamp of when the interface
         # values were originally collected by the `interfaces` collector.
-
-        metrics.append(
-            link_uptime.LinkUptimeMetric(
-                ts=ifs_data_ts,
-                tags=dict(if_name=if_name, if_desc=if_rec["if_desc"]),
-                value=if_uptime_m,
-            )
+        link_uptime.LinkUptimeMetric(
+            ts=ifs_data_ts,
+            tags=dict(if_name=if_name, if_desc=ifs_data[if_name]["if_desc"]),
+            value=if_uptime_m,
+        )
+        for if_name, if_uptime_m in uptime.ios_uptimes(
+            device,
+            ifs_data,
+            threshold=config.uptime_threshold,
+            vectorize=config.vectorize,
         )
+    ]
 
-    # done looping through interfaces, return metrics list
     return metrics
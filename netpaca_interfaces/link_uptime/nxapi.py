@@ -31,13 +31,13 @@ for metric value consistency.
 # -----------------------------------------------------------------------------
 
 from typing import Optional, List
+from functools import partial
 import re
 
 # -----------------------------------------------------------------------------
 # Public Imports
 # -----------------------------------------------------------------------------
 
-import maya
 
 from netpaca import Metric, MetricTimestamp
 from netpaca.collectors.executor import CollectorExecutor
@@ -47,7 +47,8 @@ from netpaca.drivers.nxapi import Device
 # Private Imports
 # -----------------------------------------------------------------------------
 
-from netpaca_interfaces import link_uptime
+from netpaca_interfaces import link_uptime, instrument, sharding
+from netpaca_interfaces.link_uptime import batch, descriptions, spool, bundles
 
 # -----------------------------------------------------------------------------
 # Exports (none)
@@ -89,6 +90,12 @@ async def start(
         The collector model instance that contains information about the
         collector; for example the collector configuration values.
     """
+    # in the sharded run mode, the collector is only started for the devices
+    # owned by this worker process.
+
+    if not sharding.owns(device):
+        return
+
     device.log.info(f"{device.name}: Starting Cisco NXAPI Link Flap collection")
 
     executor.start(
@@ -110,10 +117,11 @@ async def start(
 _re_timestamp = re.compile(r"(?P<H>\d\d):(?P<M>\d\d):(?P<S>\d\d)")
 
 
+@instrument.instrumented(link_uptime.name)
 async def get_link_uptimes(
     device: Device,
-    timestamp: MetricTimestamp,  # noqa unused
-    config: link_uptime.LinkUptimeCollectorConfig,  # noqa unused
+    timestamp: MetricTimestamp,
+    config: link_uptime.LinkUptimeCollectorConfig,
 ) -> Optional[List[Metric]]:
     """
     This coroutine will be executed as a asyncio Task on a periodic basis, the
@@ -134,12 +142,77 @@ async def get_link_uptimes(
     -------
     list of Metic items, or None
     """
+    import maya
 
     # wait for the interfaces collector to indicate that the data is available
     # for processing.
 
     interfaces = device.private["interfaces"]
-    await interfaces["event"].wait()
+
+    with instrument.phase("event_wait"):
+        await interfaces["event"].wait()
+
+    # the interfaces collector indicates the data is not available when the
+    # device is failing; do not report metrics from stale data.
+
+    if not interfaces.get("available", True):
+        return None
+
+    instrument.record(
+        "snapshot_age", (maya.now() - interfaces["maya_ts"]).total_seconds()
+    )
+    instrument.record(
+        "interface_count",
+        interfaces["data"].xpath("count(TABLE_interface/ROW_interface)"),
+    )
+
+    # compute the metrics, in the cross-device batch stage when enabled; the
+    # batch is run in order of the device priority tier.
+
+    with instrument.phase("compute"):
+        metrics = await batch.run(
+            config,
+            partial(link_uptime_metrics, device, interfaces, config),
+            tier=interfaces.get("tier", 0),
+        )
+
+    # provide the smallest link uptime to the interfaces collector so that
+    # adaptive polling (when enabled) tightens the schedule after a flap.
+
+    if (poll := interfaces.get("poll")) and metrics:
+        poll.observe(min(metric.value for metric in metrics))
+
+    # when the description is not a tag, report the description changes; then
+    # hold the metrics in the spool when the exporter is behind.
+
+    metrics = descriptions.untag(device, metrics, config)
+
+    # add the port-channel aggregates of the member link uptimes.
+
+    if config.bundles:
+        metrics += bundles.bundle_metrics(bundle_uptimes(interfaces), interfaces["ts"])
+
+    return spool.exchange(device, config, metrics, timestamp)
+
+
+def link_uptime_metrics(
+    device: Device, interfaces: dict, config: link_uptime.LinkUptimeCollectorConfig
+) -> List[Metric]:
+    """
+    Returns the link uptime metrics from the Cisco NX-OS interfaces collector
+    data.
+
+    Parameters
+    ----------
+    device:
+        The device driver instance
+
+    interfaces: dict
+        The device private "interfaces" area of the interfaces collector
+
+    config:
+        The collector configuration options
+    """
     interfaces_xml = interfaces["data"]
 
     # find all of the interface records that have an eth_link_flapped element,
@@ -159,18 +232,7 @@ async def get_link_uptimes(
     for rec in iface_elist:
 
         tags = dict(if_name=rec.findtext("interface"), if_desc=rec.findtext("desc"))
-
-        last_flapped = rec.findtext("eth_link_flapped")
-
-        # if the last_flapped value is in the "%H:%M:%S" format, then we need to
-        # transform it into a duration format that can be consumed by the maya
-        # package.
-
-        if (mo := _re_timestamp.match(last_flapped)) is not None:
-            last_flapped = "{}h{}m{}s".format(*mo.groups())
-
-        if_uptime = dt_now - maya.when(last_flapped)
-        if_uptime_min = if_uptime.total_seconds() // 60
+        if_uptime_min = _uptime_min(rec, dt_now)
 
         # TODO: skip any uptime that is greater than the configured threshold.
 
@@ -179,3 +241,43 @@ async def get_link_uptimes(
         )
 
     return metrics
+
+
+def _uptime_min(rec, dt_now) -> Optional[int]:
+    """
+    Returns the link uptime in minutes of the NX-OS interface record, or None
+    if the link has never flapped.
+    """
+    import maya
+
+    if (last_flapped := rec.findtext("eth_link_flapped")) in (None, "never"):
+        return None
+
+    # if the last_flapped value is in the "%H:%M:%S" format, then we need to
+    # transform it into a duration format that can be consumed by the maya
+    # package.
+
+    if (mo := _re_timestamp.match(last_flapped)) is not None:
+        last_flapped = "{}h{}m{}s".format(*mo.groups())
+
+    if_uptime = dt_now - maya.when(last_flapped)
+    return if_uptime.total_seconds() // 60
+
+
+def bundle_uptimes(interfaces: dict) -> bundles.BundleUptimes:
+    """
+    Returns the uptimes of the link-up members of each port-channel from the
+    Cisco NX-OS interfaces collector data; the member records identify their
+    port-channel by the "eth_bundle" number.
+    """
+    dt_now = interfaces["maya_ts"]
+    uptimes = dict()
+
+    for rec in interfaces["data"].xpath(
+        'TABLE_interface/ROW_interface[eth_bundle][starts-with(interface, "Eth")]'
+    ):
+        members_up = uptimes.setdefault(f"port-channel{rec.findtext('eth_bundle')}", [])
+        if rec.findtext("state") == "up":
+            members_up.append(_uptime_min(rec, dt_now))
+
+    return uptimes
@@ -36,7 +36,7 @@ from netpaca.drivers.nxos_ssh import Device
 # Private Imports
 # -----------------------------------------------------------------------------
 
-from netpaca_interfaces import link_uptime
+from netpaca_interfaces import link_uptime, sharding
 from netpaca_interfaces.link_uptime.nxapi import get_link_uptimes
 
 
@@ -81,6 +81,12 @@ async def start(
         The collector model instance that contains information about the
         collector; for example the collector configuration values.
     """
+    # in the sharded run mode, the collector is only started for the devices
+    # owned by this worker process.
+
+    if not sharding.owns(device):
+        return
+
     device.log.debug(f"{device.name}: Starting Cisco NX-OS SSH link flap collector")
 
     executor.start(
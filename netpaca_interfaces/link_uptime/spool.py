@@ -0,0 +1,304 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the bounded metric spool between the link uptime collectors
+and the exporter, enabled by the link_uptime config.spool_max option.
+
+The executor hands the metrics returned by a collector to the exporter before
+running the collector of that device again.  The metrics returned for a device
+are therefore counted as "in flight" until its collector runs again; when the
+exporter slows down the in-flight count grows.  While the in-flight count is
+below config.spool_inflight the metrics are returned as usual.  Otherwise they
+are held in the spool and returned by a later poll of the device, when the
+exporter has caught up.
+
+The spool holds at most config.spool_max metrics, according to
+config.spool_policy:
+
+    * "coalesce": a spooled metric is replaced by the newer metric of the same
+      series (metric name and tags), keeping its place in the spool, so only
+      the latest uptime per interface is kept; when full the oldest metric of
+      the device is dropped.
+    * "drop_oldest": when full the oldest metric of the device is dropped.
+    * "drop_newest": when full the new metric is dropped.
+
+When config.spool_path is set the spooled metrics are stored in that SQLite
+database rather than in memory, and are kept across a restart.  The spool depth
+and the number of dropped and coalesced metrics are reported for each device as
+the link_uptime_spool metrics.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Optional, List, Dict
+from collections import OrderedDict, Counter
+import itertools
+import pickle
+import sqlite3
+
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+from netpaca import Metric
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca_interfaces import link_uptime
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = ["MemorySpool", "DiskSpool", "MetricSpool", "exchange"]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+
+class MemorySpool(object):
+    """ the in-memory spool storage, the metrics of each device in put order """
+
+    def __init__(self):
+        self._devices: Dict[str, OrderedDict] = dict()
+
+    def depths(self) -> Dict[str, int]:
+        return {name: len(spooled) for name, spooled in self._devices.items()}
+
+    def replace(self, name: str, key: str, metric: Metric) -> bool:
+        """
+        replace the spooled metric of the key, keeping its place in the spool;
+        returns False if none
+        """
+        if (spooled := self._devices.get(name)) is None or key not in spooled:
+            return False
+
+        spooled[key] = metric
+        return True
+
+    def add(self, name: str, key: str, metric: Metric):
+        self._devices.setdefault(name, OrderedDict())[key] = metric
+
+    def pop_oldest(self, name: str) -> bool:
+        """ drop the oldest spooled metric of the device, returns False if none """
+        if not (spooled := self._devices.get(name)):
+            return False
+
+        spooled.popitem(last=False)
+        return True
+
+    def take(self, name: str, limit: int) -> List[Metric]:
+        """ remove and return up to limit of the oldest metrics of the device """
+        if not (spooled := self._devices.get(name)):
+            return []
+
+        count = min(limit, len(spooled))
+        return [spooled.popitem(last=False)[1] for _ in range(count)]
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS spool (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    device TEXT NOT NULL,
+    key TEXT NOT NULL,
+    metric BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS spool_device_key ON spool (device, key)
+"""
+
+
+class DiskSpool(object):
+    """
+    The SQLite spool storage, with the same interface as MemorySpool.
+
+    Parameters
+    ----------
+    path: str
+        The SQLite database file
+    """
+
+    def __init__(self, path: str):
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def depths(self) -> Dict[str, int]:
+        rows = self._db.execute("SELECT device, COUNT(*) FROM spool GROUP BY device")
+        return dict(rows)
+
+    def replace(self, name: str, key: str, metric: Metric) -> bool:
+        with self._db:
+            res = self._db.execute(
+                "UPDATE spool SET metric = ? WHERE device = ? AND key = ?",
+                (pickle.dumps(metric), name, key),
+            )
+
+        return bool(res.rowcount)
+
+    def _insert(self, name: str, key: str, metric: Metric):
+        self._db.execute(
+            "INSERT INTO spool (device, key, metric) VALUES (?, ?, ?)",
+            (name, key, pickle.dumps(metric)),
+        )
+
+    def add(self, name: str, key: str, metric: Metric):
+        with self._db:
+            self._insert(name, key, metric)
+
+    def pop_oldest(self, name: str) -> bool:
+        with self._db:
+            res = self._db.execute(
+                "DELETE FROM spool WHERE seq = "
+                "(SELECT MIN(seq) FROM spool WHERE device = ?)",
+                (name,),
+            )
+
+        return bool(res.rowcount)
+
+    def take(self, name: str, limit: int) -> List[Metric]:
+        rows = self._db.execute(
+            "SELECT seq, metric FROM spool WHERE device = ? ORDER BY seq LIMIT ?",
+            (name, limit),
+        ).fetchall()
+
+        if rows:
+            with self._db:
+                self._db.executemany(
+                    "DELETE FROM spool WHERE seq = ?", [(seq,) for seq, _ in rows]
+                )
+
+        return [pickle.loads(metric) for _, metric in rows]
+
+
+class MetricSpool(object):
+    """
+    The bounded metric spool of the link uptime collectors.
+
+    Parameters
+    ----------
+    max_depth: int
+        The maximum number of spooled metrics
+
+    max_inflight: int
+        The maximum number of metrics handed to the exporter
+
+    policy: str
+        The spool policy, "coalesce", "drop_oldest" or "drop_newest"
+
+    path: str
+        The SQLite database file, or None to spool in memory
+    """
+
+    def __init__(
+        self, max_depth: int, max_inflight: int, policy: str, path: Optional[str]
+    ):
+        self.max_depth = max_depth
+        self.max_inflight = max_inflight
+        self.policy = policy
+        self.store = DiskSpool(path) if path else MemorySpool()
+        self.depth = Counter(self.store.depths())
+        self.depth_total = sum(self.depth.values())
+        self.inflight: Dict[str, int] = dict()
+        self.inflight_total = 0
+        self.dropped = Counter()
+        self.coalesced = Counter()
+        self._seq = itertools.count()
+
+    def _put(self, name: str, metric: Metric):
+        if self.policy == "coalesce":
+            key = metric.name + repr(sorted(metric.tags.items()))
+            if self.store.replace(name, key, metric):
+                self.coalesced[name] += 1
+                return
+        else:
+            key = str(next(self._seq))
+
+        if self.depth_total >= self.max_depth:
+            self.dropped[name] += 1
+            if self.policy == "drop_newest" or not self.store.pop_oldest(name):
+                return
+            self.depth[name] -= 1
+            self.depth_total -= 1
+
+        self.store.add(name, key, metric)
+        self.depth[name] += 1
+        self.depth_total += 1
+
+    def exchange(self, name: str, metrics: List[Metric]) -> List[Metric]:
+        """
+        Returns the metrics of the device to hand to the exporter, spooling the
+        metrics that exceed the in-flight limit.
+        """
+        # the collector is run again, so the previous metrics were exported.
+        self.inflight_total -= self.inflight.pop(name, 0)
+        budget = max(self.max_inflight - self.inflight_total, 0)
+
+        if not self.depth[name] and len(metrics) <= budget:
+            out = metrics
+        else:
+            for metric in metrics:
+                self._put(name, metric)
+            out = self.store.take(name, budget)
+            self.depth[name] -= len(out)
+            self.depth_total -= len(out)
+
+        self.inflight[name] = len(out)
+        self.inflight_total += len(out)
+        return out
+
+    def metrics(self, name: str, timestamp) -> List[link_uptime.SpoolStatMetric]:
+        stats = dict(
+            depth=self.depth[name],
+            dropped=self.dropped[name],
+            coalesced=self.coalesced[name],
+        )
+
+        return [
+            link_uptime.SpoolStatMetric(value=value, ts=timestamp, tags=dict(stat=stat))
+            for stat, value in stats.items()
+        ]
+
+
+_spools: Dict[str, MetricSpool] = dict()
+
+
+def exchange(device, config, metrics: Optional[List[Metric]], timestamp):
+    """
+    Returns the link uptime metrics of the device to hand to the exporter, with
+    the spool statistics; or the metrics unchanged when the spool is not
+    enabled.
+    """
+    if not config.spool_max:
+        return metrics
+
+    if (spool := _spools.get(key := config.spool_path or "")) is None:
+        spool = _spools[key] = MetricSpool(
+            max_depth=config.spool_max,
+            max_inflight=config.spool_inflight,
+            policy=config.spool_policy,
+            path=config.spool_path,
+        )
+
+    out = spool.exchange(device.name, metrics or [])
+    return out + spool.metrics(device.name, timestamp)
@@ -0,0 +1,299 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the link uptime computations for the EOS and IOS link
+uptime collectors.  Each function returns the list of (if_name, uptime_min) for
+the interfaces that are link-up, excluding those up for longer than the
+threshold (when given).
+
+When vectorize is requested, NumPy is installed, and the device has at least
+VECTORIZE_MIN interfaces, the uptimes are computed as array operations over
+the status and last-change columns of the interface data; otherwise by the
+Python loop.  Building the column arrays from the interface data is itself a
+Python loop, so the NumPy computation only pays off for large interface counts
+(see benchmarks/uptime.py).  NumPy is imported on the first vectorized
+computation, so it is not loaded when vectorize is not used.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Optional, List, Tuple, Dict
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = ["VECTORIZE_MIN", "eos_uptimes", "ios_uptimes"]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+# the minimum number of interfaces for the NumPy computation, below which the
+# array overhead dominates.
+
+VECTORIZE_MIN = 1_000
+
+# the numpy module, imported by the first vectorized computation; False if it is
+# not installed.
+
+numpy = None
+
+Uptimes = List[Tuple[str, int]]
+
+
+def _vectorize(vectorize: bool, count: int) -> bool:
+    global numpy
+
+    if not vectorize or count < VECTORIZE_MIN:
+        return False
+
+    if numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+
+    return numpy is not False
+
+
+# -----------------------------------------------------------------------------
+#                                  Arista EOS
+# -----------------------------------------------------------------------------
+
+
+def eos_uptimes(
+    eos_data: Dict[str, Dict],
+    now: float,
+    threshold: Optional[int] = None,
+    vectorize: bool = False,
+) -> Uptimes:
+    """
+    Returns the link uptimes, in minutes, from the EAPI "show interfaces" data.
+
+    Parameters
+    ----------
+    eos_data: dict
+        The "interfaces" dict of the EAPI output
+
+    now: float
+        The time the data was collected, seconds since epoch
+
+    threshold: int
+        When set, exclude interfaces up for longer than this many minutes
+
+    vectorize: bool
+        When True, use the NumPy computation if available
+    """
+    if _vectorize(vectorize, len(eos_data)):
+        return _eos_uptimes_numpy(eos_data, now, threshold)
+
+    uptimes = list()
+
+    for if_name, if_data in eos_data.items():
+        if if_data["interfaceStatus"] != "connected":
+            continue
+
+        if (last_change := if_data["lastStatusChangeTimestamp"]) is None:
+            continue
+
+        uptime_min = int((now - last_change) // 60)
+        if threshold and uptime_min > threshold:
+            continue
+
+        uptimes.append((if_name, uptime_min))
+
+    return uptimes
+
+
+def _eos_uptimes_numpy(eos_data, now, threshold) -> Uptimes:
+    count = len(eos_data)
+    names = numpy.array(list(eos_data), dtype=object)
+    recs = eos_data.values()
+
+    link_up = numpy.fromiter(
+        (rec["interfaceStatus"] == "connected" for rec in recs),
+        dtype=bool,
+        count=count,
+    )
+    # the None last-change values are NaN, and excluded by the mask.
+
+    last_change = numpy.fromiter(
+        (
+            numpy.nan if (value := rec["lastStatusChangeTimestamp"]) is None else value
+            for rec in recs
+        ),
+        dtype=float,
+        count=count,
+    )
+
+    uptime_min = (now - last_change) // 60
+    mask = link_up & ~numpy.isnan(last_change)
+    if threshold:
+        mask &= uptime_min <= threshold
+
+    return list(zip(names[mask].tolist(), uptime_min[mask].astype(int).tolist()))
+
+
+# -----------------------------------------------------------------------------
+#                                  Cisco IOS
+# -----------------------------------------------------------------------------
+
+# sysUpTime ticks (1/100 sec) in 5 minutes
+_TICKS_5MIN = 30_000
+
+
+def ios_uptimes(
+    device,
+    ifs_data: Dict[str, Dict],
+    threshold: Optional[int] = None,
+    vectorize: bool = False,
+) -> Uptimes:
+    """
+    Returns the link uptimes, in minutes, from the IOS SNMP interface data,
+    correcting the ifLastChange values for a sysUpTime wrap.
+
+    Parameters
+    ----------
+    device:
+        The device instance, the private area has the sysUpTime values stored
+        by the interfaces collector.
+
+    ifs_data: dict
+        The interfaces collector SNMP data, keyed by interface name
+
+    threshold: int
+        When set, exclude interfaces up for longer than this many minutes
+
+    vectorize: bool
+        When True, use the NumPy computation if available
+    """
+    if _vectorize(vectorize, len(ifs_data)):
+        return _ios_uptimes_numpy(device, ifs_data, threshold)
+
+    dev_uptime_wrapped = device.private["sys_uptime_wrapped"]
+    did_wrap = dev_uptime_wrapped > 0
+    sys_uptime = device.private["sys_uptime"]
+    orig_sys_uptime = device.private["orig_sys_uptime"]
+
+    uptimes = list()
+
+    for if_name, if_rec in ifs_data.items():
+
+        # skip any interfaces that are not link-up; the value is None when the
+        # interfaces collector produced partial data.
+        if not if_rec["if_link_up"]:
+            continue
+
+        # skip any interface that have ifLastChange == 0 (never), or None when
+        # the interfaces collector produced partial data.
+        if not (if_lc := if_rec["if_lastchange"]):
+            continue
+
+        # need to change scenarios where sysUpTime may have wrapped.  code
+        # lifted from Netdisco project per cited References.
+        orig_if_lc = if_lc
+
+        if did_wrap and if_lc < orig_sys_uptime:
+            # ambiguous: lastchange could be sysUptime before or after wrap
+
+            if (sys_uptime > _TICKS_5MIN) and (if_lc < _TICKS_5MIN):
+                # uptime wrap more than 5min ago but lastchange within 5min
+                # assume lastchange was directly after boot -> no action
+                pass
+
+            else:
+                # uptime wrap less than 5min ago or lastchange > 5min ago
+                # to be on safe side, assume lastchange after counter wrap
+                device.log.warning(
+                    f"{device.name}:{if_name} - correcting ifLastChange, "
+                    "assuming sysUpTime wrap"
+                )
+                if_lc += dev_uptime_wrapped * 2 ** 32
+
+        # compute the interface uptime in minutes
+
+        if_uptime_m = (sys_uptime - if_lc) // 6_000
+
+        if if_uptime_m < 0:
+            # should never get this error, but leaving this here just in case :-)
+            device.log.error(
+                f"{device.name}: negative time: {if_uptime_m}:\n"
+                f"dev_uptime_wrapped={dev_uptime_wrapped}, sys_uptime={sys_uptime},"
+                f"orig_if_lc={orig_if_lc}, if_lc={if_lc}"
+            )
+
+        if threshold and if_uptime_m > threshold:
+            continue
+
+        uptimes.append((if_name, if_uptime_m))
+
+    return uptimes
+
+
+def _ios_uptimes_numpy(device, ifs_data, threshold) -> Uptimes:
+    dev_uptime_wrapped = device.private["sys_uptime_wrapped"]
+    sys_uptime = device.private["sys_uptime"]
+    orig_sys_uptime = device.private["orig_sys_uptime"]
+
+    count = len(ifs_data)
+    names = numpy.array(list(ifs_data), dtype=object)
+    recs = ifs_data.values()
+
+    # the None values (partial data) are mapped to 0, and so excluded by the
+    # mask in the same manner as the "never" ifLastChange value.
+
+    link_up = numpy.fromiter(
+        (bool(rec["if_link_up"]) for rec in recs), dtype=bool, count=count
+    )
+    if_lc = numpy.fromiter(
+        (rec["if_lastchange"] or 0 for rec in recs), dtype=numpy.int64, count=count
+    )
+
+    mask = link_up & (if_lc != 0)
+
+    # sysUpTime wrap correction, see the Python loop for the rationale.
+
+    if dev_uptime_wrapped > 0:
+        wrapped = mask & (if_lc < orig_sys_uptime)
+        if sys_uptime > _TICKS_5MIN:
+            wrapped &= if_lc >= _TICKS_5MIN
+
+        for if_name in names[wrapped]:
+            device.log.warning(
+                f"{device.name}:{if_name} - correcting ifLastChange, "
+                "assuming sysUpTime wrap"
+            )
+
+        if_lc = numpy.where(wrapped, if_lc + dev_uptime_wrapped * 2 ** 32, if_lc)
+
+    uptime_min = (sys_uptime - if_lc) // 6_000
+
+    if (negative := mask & (uptime_min < 0)).any():
+        device.log.error(
+            f"{device.name}: negative time for interfaces: "
+            f"{', '.join(names[negative])}, dev_uptime_wrapped={dev_uptime_wrapped}, "
+            f"sys_uptime={sys_uptime}"
+        )
+
+    if threshold:
+        mask &= uptime_min <= threshold
+
+    return list(zip(names[mask].tolist(), uptime_min[mask].tolist()))
@@ -0,0 +1,243 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the per-device memory accounting, enabled by the interfaces
+collector `memory_report` option.
+
+When enabled, tracemalloc is started and every $memory_report seconds a report
+is logged with:
+
+    * the top $memory_top source lines by allocated memory (tracemalloc)
+    * the top $memory_top devices by retained memory, with the size of each of
+      the device private entries ("interfaces", "pysnmp", "if_rates", ...) and
+      of the last output of each collector ("output:<collector>").
+
+The retained size of an entry is the size of the Python objects reachable from
+it, so objects shared by two entries are counted in both.  The libxml2 memory
+of the NX-OS lxml trees is not allocated by Python; it is reported as the
+number of XML elements instead.
+
+With the `memory_metrics` option the device figures are also emitted as
+`CollectorMemoryMetric` by the interfaces collector.  The collector outputs are
+measured on the first poll after each report, so the accounting cost is once
+per report interval per device.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Optional, List, Dict, Tuple
+from types import ModuleType, FunctionType, MethodType
+import asyncio
+import logging
+import sys
+import tracemalloc
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+import netpaca_interfaces as interfaces
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = ["MemoryAccounting", "deep_size", "account"]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+# objects that are not owned by the device and are not followed when sizing.
+_SHARED = (
+    type,
+    ModuleType,
+    FunctionType,
+    MethodType,
+    logging.Logger,
+    asyncio.AbstractEventLoop,
+    asyncio.Future,
+)
+
+
+def deep_size(obj) -> Tuple[int, int]:
+    """
+    Returns the retained size in bytes of the Python objects reachable from
+    obj, and the number of lxml elements found.
+    """
+    seen = set()
+    todo = [obj]
+    size = elements = 0
+
+    while todo:
+        obj = todo.pop()
+        if id(obj) in seen or isinstance(obj, _SHARED):
+            continue
+
+        seen.add(id(obj))
+
+        if hasattr(obj, "xpath") and hasattr(obj, "iter"):
+            # lxml element, the tree is held by libxml2.
+            elements += sum(1 for _ in obj.iter())
+            continue
+
+        size += sys.getsizeof(obj, 0)
+
+        if isinstance(obj, dict):
+            todo.extend(obj.keys())
+            todo.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            todo.extend(obj)
+        elif not isinstance(obj, (str, bytes, int, float)):
+            if (attrs := getattr(obj, "__dict__", None)) is not None:
+                todo.append(attrs)
+            for slot in getattr(type(obj), "__slots__", ()):
+                if (value := getattr(obj, slot, None)) is not None:
+                    todo.append(value)
+
+    return size, elements
+
+
+class MemoryAccounting(object):
+    """
+    The process memory accounting state.
+
+    Parameters
+    ----------
+    interval: int
+        The number of seconds between reports
+
+    top: int
+        The number of entries in each part of the report
+    """
+
+    def __init__(self, interval: int, top: int):
+        self.interval = interval
+        self.top = top
+        self.log = logging.getLogger(__name__)
+        self.devices = dict()
+        self.outputs: Dict[str, Dict[str, int]] = dict()
+        self.sampled = set()
+        self.usage: Dict[str, Dict[str, int]] = dict()
+        self.elements: Dict[str, int] = dict()
+        self.task = asyncio.create_task(self._run())
+
+    def output(self, collector: str, device, metrics: Optional[List]):
+        """ measure the collector output on the first poll after a report """
+        self.devices[device.name] = device
+
+        if (key := (collector, device.name)) in self.sampled:
+            return
+
+        self.sampled.add(key)
+        size, _ = deep_size(metrics or [])
+        self.outputs.setdefault(device.name, dict())[f"output:{collector}"] = size
+
+    def metrics(self, device, timestamp) -> List[interfaces.CollectorMemoryMetric]:
+        return [
+            interfaces.CollectorMemoryMetric(
+                value=value, ts=timestamp, tags=dict(entry=entry)
+            )
+            for entry, value in self.usage.get(device.name, {}).items()
+        ]
+
+    def measure(self):
+        """ measure the retained memory of each device """
+        usage = dict()
+        elements = dict()
+
+        for name, device in self.devices.items():
+            entries = usage[name] = dict(self.outputs.get(name, {}))
+            elements[name] = 0
+            for key, value in list(device.private.items()):
+                entries[key], count = deep_size(value)
+                elements[name] += count
+
+        self.usage = usage
+        self.elements = elements
+        self.sampled.clear()
+
+    def report(self) -> str:
+        """ measure the devices and return the report text """
+        self.measure()
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+        current, peak = tracemalloc.get_traced_memory()
+
+        lines = [f"memory: traced {current:,} bytes, peak {peak:,} bytes"]
+        lines.append(f"top {self.top} allocations by source line:")
+        for stat in snapshot.statistics("lineno")[: self.top]:
+            lines.append(f"    {stat}")
+
+        totals = sorted(
+            ((sum(entries.values()), name) for name, entries in self.usage.items()),
+            reverse=True,
+        )
+
+        lines.append(f"top {self.top} devices by retained memory:")
+        for total, name in totals[: self.top]:
+            entries = ", ".join(
+                f"{entry}={value:,}"
+                for entry, value in sorted(
+                    self.usage[name].items(), key=lambda i: i[1], reverse=True
+                )
+            )
+            lines.append(
+                f"    {name}: {total:,} bytes, {self.elements[name]:,} xml elements"
+                f" ({entries})"
+            )
+
+        return "\n".join(lines)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.log.info(self.report())
+            except Exception as exc:  # noqa
+                self.log.error(f"memory report failed: {exc}")
+
+
+_accounting: Optional[MemoryAccounting] = None
+
+
+def account(collector: str, device, config, metrics, timestamp) -> Optional[List]:
+    """
+    Account the collector output, and returns the collector metrics with the
+    device memory metrics when enabled.  The accounting is started by the first
+    interfaces collector poll with the `memory_report` option.
+    """
+    global _accounting
+
+    if _accounting is None:
+        if collector != interfaces.name or not config.memory_report:
+            return metrics
+
+        tracemalloc.start()
+        _accounting = MemoryAccounting(config.memory_report, config.memory_top)
+
+    _accounting.output(collector, device, metrics)
+
+    if collector != interfaces.name or not config.memory_metrics:
+        return metrics
+
+    return (metrics or []) + _accounting.metrics(device, timestamp) or None
@@ -25,12 +25,12 @@ Device: Cisco NX-OS via NXAPI
 
 from typing import Optional, List
 from asyncio import Event
+import asyncio
 
 # -----------------------------------------------------------------------------
 # Public Imports
 # -----------------------------------------------------------------------------
 
-import maya
 
 from netpaca import Metric, MetricTimestamp
 from netpaca.collectors.executor import CollectorExecutor
@@ -42,6 +42,8 @@ from netpaca.drivers.nxapi import Device
 # -----------------------------------------------------------------------------
 
 import netpaca_interfaces as interfaces
+from netpaca_interfaces import polling, instrument, replay, sharding, snapshot
+from netpaca_interfaces import filters, commands
 
 # -----------------------------------------------------------------------------
 # Exports (none)
@@ -81,8 +83,22 @@ async def start(device: Device, executor: CollectorExecutor, spec: CollectorMode
         The collector model instance that contains information about the
         collector; for example the collector configuration values.
     """
+    # in the sharded run mode, the collector is only started for the devices
+    # owned by this worker process.
+
+    if not sharding.owns(device):
+        return
+
     device.log.info(f"{device.name}: Starting Cisco NXAPI interfaces collector")
-    device.private["interfaces"] = {"event": Event()}
+    device.private["interfaces"] = {
+        "event": Event(),
+        "poll": polling.adaptive_poll(spec.config),
+        "breaker": polling.circuit_breaker(spec.config),
+    }
+
+    # when replay is enabled, the device responses are served from the recorded
+    # capture file rather than the device.
+    replay.attach(device, spec.config)
 
     executor.start(
         # required args
@@ -101,6 +117,7 @@ async def start(device: Device, executor: CollectorExecutor, spec: CollectorMode
 # -----------------------------------------------------------------------------
 
 
+@instrument.instrumented(interfaces.name)
 async def get_raw_interfaces(
     device: Device, timestamp: MetricTimestamp, config  # noqa
 ) -> Optional[List[Metric]]:
@@ -123,16 +140,65 @@ async def get_raw_interfaces(
     -------
     list of Metic items, or None
     """
+    import maya
+
+    # when adaptive polling is enabled, skip this collection interval if the
+    # device is currently backed off.
+
+    if (poll := device.private["interfaces"]["poll"]) and not poll.should_poll():
+        return None
+
+    # when the circuit breaker is open, skip polling the failing device.
+
+    if (breaker := device.private["interfaces"]["breaker"]) and not breaker.allow():
+        return None
+
+    # in the cluster mode, only poll the devices owned by this node.
+
+    if not sharding.cluster_owns(device):
+        return None
+
+    deadline = polling.PollDeadline(config)
+
+    try:
+        async with polling.poll_slot(device, config):
+            with instrument.phase("fetch"):
+                command = filters.show_interface("show interface", config)
+                extra = commands.registered(device)
+                res = await deadline.fetch(device.nxapi.exec([command, *extra]))
+
+    except polling.PollShed:
+        return polling.poll_shed(device, timestamp)
+
+    except asyncio.TimeoutError:
+        device.log.error(
+            f"{device.name}: interface data not received within "
+            f"{deadline.fetch_timeout}s, will try again."
+        )
+        polling.poll_failed(device)
+        return deadline.overrun(timestamp, "fetch")
 
-    res = await device.nxapi.exec(["show interface"])
     nxapi_sh_iface = res[0]
 
     if not nxapi_sh_iface.ok:
         device.log.error(
             f"{device.name}: unable to obtain interface data, will try again."
         )
+        polling.poll_failed(device)
         return None
 
+    replay.capture(device, config, deadline.elapsed, xml=nxapi_sh_iface.output)
+
+    # store the output of the commands registered by the other collectors.
+
+    if extra:
+        commands.dispatch(device, extra, res[1:])
+
+    # remove the interfaces that are not selected by the configured filter.
+
+    if flt := filters.interface_filter(config):
+        filters.filter_nxos(flt, nxapi_sh_iface.output)
+
     # store the raw interfaces data into the private area of the device instance
     # so that it can be used by other collectors.  The method used here is just
     # a first trial; might use something different in the future.
@@ -141,8 +207,29 @@ async def get_raw_interfaces(
         {"ts": timestamp, "maya_ts": maya.now(), "data": nxapi_sh_iface.output}
     )
 
+    instrument.record(
+        "interface_count",
+        len(nxapi_sh_iface.output.xpath("TABLE_interface/ROW_interface")),
+    )
+
+    if snapshot.wanted(device, config):
+        snapshot.store(
+            device,
+            config,
+            snapshot.normalize_nxos(
+                nxapi_sh_iface.output,
+                device.private["interfaces"]["maya_ts"].epoch,
+                snapshot.prior(device, config),
+            ),
+        )
+
+    polling.poll_succeeded(device)
+
     # trigger the pending tasks to awake to process the data.
     device.private["interfaces"]["event"].set()
 
-    # no metrics to export, so return None.
-    return None
+    if poll:
+        poll.polled()
+
+    # report an overrun if processing the data exceeded the poll deadline.
+    return deadline.overrun(timestamp, "parse") or None
@@ -0,0 +1,220 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""
+Collector: Interfaces via gNMI streaming telemetry
+Device: Cisco NX-OS via NXAPI
+
+The collector maintains a gNMI ON_CHANGE subscription to the device, and
+publishes the interface data in the same XML structure as "show interface" so
+that the link_uptime.nxapi collector consumes it unchanged.
+
+Use this module in place of `netpaca_interfaces.nxapi` in the device driver
+modules list.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import TYPE_CHECKING, Optional, List, Dict
+import asyncio
+
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+from netpaca import Metric, MetricTimestamp
+from netpaca.collectors.executor import CollectorExecutor
+from netpaca.config_model import CollectorModel
+from netpaca.drivers.nxapi import Device
+
+if TYPE_CHECKING:
+    from lxml import etree
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+import netpaca_interfaces as interfaces
+from netpaca_interfaces import gnmi, instrument, sharding
+
+# -----------------------------------------------------------------------------
+# Exports (none)
+# -----------------------------------------------------------------------------
+
+__all__ = []
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#
+#                 Register Cisco Device NXAPI to Colletor Type
+#
+# -----------------------------------------------------------------------------
+
+
+@interfaces.register
+async def start(device: Device, executor: CollectorExecutor, spec: CollectorModel):
+    """
+    The interfaces collector start coroutine for Cisco NX-OS devices using gNMI
+    streaming telemetry.  The subscription is run as a background task for the
+    lifetime of the collector, and the executor task periodically publishes
+    the interface data for the consuming collectors.
+
+    Parameters
+    ----------
+    device:
+        The device driver instance for the Cisco device
+
+    executor:
+        The executor that is used to start one or more collector tasks. In this
+        instance, there is only one collector task started per device.
+
+    spec:
+        The collector model instance that contains information about the
+        collector; for example the collector configuration values.
+    """
+    # in the sharded run mode, the collector is only started for the devices
+    # owned by this worker process.
+
+    if not sharding.owns(device):
+        return
+
+    device.log.info(f"{device.name}: Starting Cisco NX-OS gNMI interfaces collector")
+
+    store = dict()
+    device.private["interfaces"] = {
+        "event": asyncio.Event(),
+        "gnmi": store,
+        "gnmi_task": asyncio.create_task(gnmi.run_subscription(device, store)),
+    }
+
+    executor.start(
+        # required args
+        spec=spec,
+        coro=publish_interfaces,
+        device=device,
+        # kwargs to collector coroutine:
+        config=spec.config,
+    )
+
+
+# -----------------------------------------------------------------------------
+#
+#                             Collector Coroutine
+#
+# -----------------------------------------------------------------------------
+
+
+def _flapped_ago(seconds: int) -> str:
+    """
+    Return the NX-OS "eth_link_flapped" representation of the given duration,
+    using the "07:20:17" format for less than a day and "3d04h" otherwise.
+    """
+    if seconds < 86_400:
+        return "{:02}:{:02}:{:02}".format(
+            seconds // 3600, (seconds % 3600) // 60, seconds % 60
+        )
+
+    return "{}d{:02}h".format(seconds // 86_400, (seconds % 86_400) // 3600)
+
+
+def as_nxos_xml(store: Dict[str, Dict], epoch_now: float) -> "etree.Element":
+    """
+    Transform the gNMI interface store into the subset of the NX-OS "show
+    interface" XML structure that is used by the consuming collectors.  The
+    interfaces without a last-change value are not included until it is
+    received.
+    """
+    from lxml import etree
+
+    root = etree.Element("__readonly__")
+    table = etree.SubElement(root, "TABLE_interface")
+
+    for if_name, leafs in store.items():
+        if "last-change" not in leafs:
+            continue
+
+        row = etree.SubElement(table, "ROW_interface")
+        etree.SubElement(row, "interface").text = if_name
+        etree.SubElement(row, "desc").text = leafs.get("description", "")
+        etree.SubElement(row, "state").text = leafs.get("oper-status", "").lower()
+
+        # OpenConfig last-change is nanoseconds since epoch, NX-OS reports the
+        # value as the duration since the last flap.
+
+        if last_change := int(leafs["last-change"]):
+            flapped = _flapped_ago(max(int(epoch_now - last_change / 1e9), 0))
+        else:
+            flapped = "never"
+
+        etree.SubElement(row, "eth_link_flapped").text = flapped
+
+    return root
+
+
+@instrument.instrumented(interfaces.name)
+async def publish_interfaces(
+    device: Device, timestamp: MetricTimestamp, config  # noqa
+) -> Optional[List[Metric]]:
+    """
+    This coroutine will be executed as a asyncio Task on a periodic basis, the
+    purpose is to publish the interface data maintained by the gNMI
+    subscription to the consuming collectors.
+
+    Parameters
+    ----------
+    device:
+        The Cisco device driver instance for this device.
+
+    timestamp: MetricTimestamp
+        The current timestamp
+
+    config:
+        The collector configuration options
+
+    Returns
+    -------
+    None, there are no metrics exported by this collector.
+    """
+    import maya
+
+    ifs = device.private["interfaces"]
+
+    if not ifs["gnmi"]:
+        device.log.warning(
+            f"{device.name}: no gNMI interface data yet, will try again."
+        )
+        return None
+
+    maya_now = maya.now()
+
+    with instrument.phase("parse"):
+        data = as_nxos_xml(ifs["gnmi"], maya_now.epoch)
+
+    ifs.update({"ts": timestamp, "maya_ts": maya_now, "data": data})
+    instrument.record("interface_count", len(ifs["gnmi"]))
+
+    # trigger the pending tasks to awake to process the data.
+    ifs["event"].set()
+
+    # no metrics to export, so return None.
+    return None
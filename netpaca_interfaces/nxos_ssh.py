@@ -25,13 +25,12 @@ Device: Cisco NX-OS via NXAPI
 
 from typing import Optional, List
 from asyncio import Event
+import asyncio
 
 # -----------------------------------------------------------------------------
 # Public Imports
 # -----------------------------------------------------------------------------
 
-import maya
-from lxml import etree
 from netpaca import Metric, MetricTimestamp
 from netpaca.collectors.executor import CollectorExecutor
 from netpaca.config_model import CollectorModel
@@ -42,6 +41,8 @@ from netpaca.drivers.nxos_ssh import Device
 # -----------------------------------------------------------------------------
 
 import netpaca_interfaces as interfaces
+from netpaca_interfaces import polling, instrument, replay, sharding, snapshot
+from netpaca_interfaces import filters
 
 # -----------------------------------------------------------------------------
 # Exports (none)
@@ -81,8 +82,22 @@ async def start(device: Device, executor: CollectorExecutor, spec: CollectorMode
         The collector model instance that contains information about the
         collector; for example the collector configuration values.
     """
+    # in the sharded run mode, the collector is only started for the devices
+    # owned by this worker process.
+
+    if not sharding.owns(device):
+        return
+
     device.log.info(f"{device.name}: Starting Cisco SSH interfaces collector")
-    device.private["interfaces"] = {"event": Event()}
+    device.private["interfaces"] = {
+        "event": Event(),
+        "poll": polling.adaptive_poll(spec.config),
+        "breaker": polling.circuit_breaker(spec.config),
+    }
+
+    # when replay is enabled, the device responses are served from the recorded
+    # capture file rather than the device.
+    replay.attach(device, spec.config)
 
     executor.start(
         # required args
@@ -101,6 +116,7 @@ async def start(device: Device, executor: CollectorExecutor, spec: CollectorMode
 # -----------------------------------------------------------------------------
 
 
+@instrument.instrumented(interfaces.name)
 async def get_raw_interfaces(
     device: Device, timestamp: MetricTimestamp, config: CollectorModel  # noqa
 ) -> Optional[List[Metric]]:
@@ -123,27 +139,78 @@ async def get_raw_interfaces(
     -------
     list of Metic items, or None
     """
+    import maya
+    from lxml import etree
+
+    # when adaptive polling is enabled, skip this collection interval if the
+    # device is currently backed off.
+
+    if (poll := device.private["interfaces"]["poll"]) and not poll.should_poll():
+        return None
+
+    # when the circuit breaker is open, skip polling the failing device.
+
+    if (breaker := device.private["interfaces"]["breaker"]) and not breaker.allow():
+        return None
+
+    # in the cluster mode, only poll the devices owned by this node.
+
+    if not sharding.cluster_owns(device):
+        return None
 
     # NOTE: the newline is *required* due to the nature of the device driver looking for
     #       prompt-matching.  Refer to Carl Montanari, author of scrapli.
-    res = await device.driver.send_command("show interface | xml\n")
+    deadline = polling.PollDeadline(config)
+
+    try:
+        async with polling.poll_slot(device, config):
+            with instrument.phase("fetch"):
+                command = filters.show_interface("show interface", config)
+                res = await deadline.fetch(
+                    device.driver.send_command(f"{command} | xml\n")
+                )
+
+    except polling.PollShed:
+        return polling.poll_shed(device, timestamp)
+
+    except asyncio.TimeoutError:
+        device.log.error(
+            f"{device.name}: interface data not received within "
+            f"{deadline.fetch_timeout}s, will try again."
+        )
+        polling.poll_failed(device)
+        return deadline.overrun(timestamp, "fetch")
+
     if res.failed:
         device.log.error(
             f"{device.name}: unable to obtain interface data, will try again."
         )
+        polling.poll_failed(device)
         return None
 
+    replay.capture(device, config, deadline.elapsed, text=res.result)
+
     # the CLI command response is text, and we need to "take" the
     # TABLE_interface element only so that we can parse it into an XML structure
     # for later use by the collectors.  The element that parents TABLE_interface
     # is <__readonly__>
 
-    start_of_xml = res.result.find("<__readonly__>")
-    etag = "</__readonly__>"
-    end_of_xml = res.result.rfind(etag) + len(etag)
-    content = res.result[start_of_xml:end_of_xml]
+    instrument.record("payload_bytes", len(res.result))
+
+    with instrument.phase("parse"):
+        start_of_xml = res.result.find("<__readonly__>")
+        etag = "</__readonly__>"
+        end_of_xml = res.result.rfind(etag) + len(etag)
+        content = res.result[start_of_xml:end_of_xml]
+
+        as_xml = etree.fromstring(content)
 
-    as_xml = etree.fromstring(content)
+        if flt := filters.interface_filter(config):
+            filters.filter_nxos(flt, as_xml)
+
+    instrument.record(
+        "interface_count", len(as_xml.xpath("TABLE_interface/ROW_interface"))
+    )
 
     # store the raw interfaces data into the private area of the device instance
     # so that it can be used by other collectors.  The method used here is just
@@ -153,8 +220,24 @@ async def get_raw_interfaces(
         {"ts": timestamp, "maya_ts": maya.now(), "data": as_xml}
     )
 
+    if snapshot.wanted(device, config):
+        snapshot.store(
+            device,
+            config,
+            snapshot.normalize_nxos(
+                as_xml,
+                device.private["interfaces"]["maya_ts"].epoch,
+                snapshot.prior(device, config),
+            ),
+        )
+
+    polling.poll_succeeded(device)
+
     # trigger the pending tasks to awake to process the data.
     device.private["interfaces"]["event"].set()
 
-    # no metrics to export, so return None.
-    return None
+    if poll:
+        poll.polled()
+
+    # report an overrun if processing the data exceeded the poll deadline.
+    return deadline.overrun(timestamp, "parse") or None
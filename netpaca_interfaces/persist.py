@@ -0,0 +1,139 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the warm-start persistence of the normalized interface
+snapshots, so that the collectors resume with a baseline after a restart.
+
+The snapshots are stored in a SQLite database in WAL mode, one row per device.
+Updates are held in memory and flushed periodically by a background task; the
+database writes are run in a dedicated worker thread so they do not block the
+event loop.  The stored snapshots are loaded on first use, in one read.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Optional, Dict
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import json
+import sqlite3
+import time
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = ["SnapshotStore", "get_store"]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    device TEXT PRIMARY KEY,
+    ts REAL NOT NULL,
+    snapshot TEXT NOT NULL
+)
+"""
+
+
+class SnapshotStore(object):
+    """
+    The on-disk store of the normalized interface snapshots.
+
+    Parameters
+    ----------
+    path: str
+        The SQLite database file
+
+    flush_interval: int
+        The number of seconds between flushes of the updated snapshots
+    """
+
+    def __init__(self, path: str, flush_interval: int):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(_SCHEMA)
+        self._writer = ThreadPoolExecutor(max_workers=1)
+        self._loaded: Optional[Dict[str, str]] = None
+        self._dirty: Dict[str, str] = dict()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def load(self, name: str) -> Optional[Dict]:
+        """ returns the stored snapshot of the device, if any """
+        if self._loaded is None:
+            rows = self._db.execute("SELECT device, snapshot FROM snapshots")
+            self._loaded = dict(rows)
+
+        if (stored := self._loaded.pop(name, None)) is None:
+            return None
+
+        return json.loads(stored)
+
+    def put(self, name: str, snapshot: Dict):
+        """ record the device snapshot, written on the next flush """
+        self._dirty[name] = json.dumps(snapshot, separators=(",", ":"))
+
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._run_flush())
+
+    def _write(self, rows):
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?)", rows
+            )
+
+    async def flush(self):
+        """ write the updated snapshots to the database """
+        if not self._dirty:
+            return
+
+        now = time.time()
+        rows = [(name, now, snapshot) for name, snapshot in self._dirty.items()]
+        self._dirty = dict()
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._writer, self._write, rows)
+
+    async def _run_flush(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+
+_stores: Dict[str, SnapshotStore] = dict()
+
+
+def get_store(config) -> Optional[SnapshotStore]:
+    """
+    Returns the snapshot store given the interfaces collector configuration, or
+    None if persistence is not enabled.
+    """
+    if not (path := config.snapshot_store):
+        return None
+
+    if (store := _stores.get(path)) is None:
+        store = _stores[path] = SnapshotStore(path, config.snapshot_flush_interval)
+
+    return store
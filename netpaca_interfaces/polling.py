@@ -0,0 +1,480 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the polling controls that are shared by the device specific
+interfaces collectors.  The controls are stored in the device private
+"interfaces" area so that the link_uptime consumers can provide feedback.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Optional, List, Dict, Awaitable
+from contextlib import asynccontextmanager
+import asyncio
+import csv
+import heapq
+import itertools
+import random
+import time
+import zlib
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+import netpaca_interfaces as interfaces
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = [
+    "AdaptivePoll",
+    "adaptive_poll",
+    "phase_offset",
+    "poll_slot",
+    "PrioritySlots",
+    "priority_tier",
+    "PollShed",
+    "poll_shed",
+    "CircuitBreaker",
+    "circuit_breaker",
+    "poll_failed",
+    "poll_succeeded",
+    "PollDeadline",
+]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+
+class AdaptivePoll(object):
+    """
+    Adaptive polling schedule for a single device.  The executor runs the
+    interfaces collector on every collection interval (a "tick"); this class
+    decides on which ticks the device is actually polled.
+
+    A device that has not flapped recently is backed off, doubling the number
+    of ticks between polls after each stable poll, up to `max_ticks`.  When a
+    consumer observes a link transition within the `flap_window` the schedule
+    is reset so that the device is polled on every tick.  A random jitter of up
+    to `jitter` (fraction) of the backoff is added so that devices that became
+    stable at the same time do not poll in lock-step.
+    """
+
+    def __init__(self, max_ticks: int, flap_window: int, jitter: float = 0.1):
+        self.max_ticks = max(max_ticks, 1)
+        self.flap_window = flap_window
+        self.jitter = jitter
+        self.backoff = 1
+        self.countdown = 0
+        self.flapped = False
+
+    def should_poll(self) -> bool:
+        """ returns True if the device should be polled on this tick """
+        if self.countdown > 0:
+            self.countdown -= 1
+            return False
+
+        return True
+
+    def polled(self):
+        """ called by the interfaces collector after each successful poll """
+        if self.flapped:
+            self.backoff = 1
+        else:
+            self.backoff = min(self.backoff * 2, self.max_ticks)
+
+        self.flapped = False
+        jitter = random.randint(0, int(self.backoff * self.jitter))
+        self.countdown = min(self.backoff - 1 + jitter, self.max_ticks - 1)
+
+    def observe(self, uptime_min: float):
+        """
+        called by the consumer collectors with the smallest link uptime (in
+        minutes) found in the current interface data.
+        """
+        if uptime_min < self.flap_window:
+            self.flapped = True
+            self.backoff = 1
+            self.countdown = 0
+
+
+def adaptive_poll(config) -> Optional[AdaptivePoll]:
+    """
+    Returns the adaptive polling schedule for a device given the interfaces
+    collector configuration, or None if adaptive polling is not enabled.
+    """
+    if not config.poll_backoff_max:
+        return None
+
+    return AdaptivePoll(
+        max_ticks=config.poll_backoff_max,
+        flap_window=config.poll_flap_window,
+        jitter=config.poll_jitter,
+    )
+
+
+# -----------------------------------------------------------------------------
+#
+#                         Poll Staggering and Concurrency
+#
+# -----------------------------------------------------------------------------
+
+# the process wide limit on in-flight device polls, created on first use so that
+# it is bound to the running event loop.
+_poll_slots: Optional["PrioritySlots"] = None
+
+
+def phase_offset(name: str, window: int) -> float:
+    """
+    Returns the deterministic phase offset, in seconds within [0, window), for
+    the given device name.  The value is stable across process restarts (unlike
+    the builtin hash) so that a device always polls at the same point of the
+    collection interval.
+    """
+    return (zlib.crc32(name.encode()) % (window * 1000)) / 1000
+
+
+class PollShed(Exception):
+    """ the device poll was skipped because no poll slot was free in time """
+
+
+class PrioritySlots(object):
+    """
+    The limit on in-flight device polls.  When all slots are in use the waiting
+    polls are granted the free slots in order of priority tier (0 first), then
+    in order of arrival.
+
+    Parameters
+    ----------
+    limit: int
+        The number of in-flight polls
+    """
+
+    def __init__(self, limit: int):
+        self.free = limit
+        self._waiters = list()
+        self._seq = itertools.count()
+
+    async def acquire(self, tier: int, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for a free slot, returns False if none was granted within the
+        timeout (seconds, None waits forever).
+        """
+        if self.free > 0 and not self._waiters:
+            self.free -= 1
+            return True
+
+        granted = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (tier, next(self._seq), granted))
+
+        try:
+            await asyncio.wait([granted], timeout=timeout)
+        except asyncio.CancelledError:
+            if granted.done():
+                self.release()
+            granted.cancel()
+            raise
+
+        if granted.done():
+            return True
+
+        granted.cancel()
+        return False
+
+    def release(self):
+        """ grant the slot to the highest priority waiter, or free it """
+        while self._waiters:
+            *_, granted = heapq.heappop(self._waiters)
+            if not granted.done():
+                granted.set_result(True)
+                return
+
+        self.free += 1
+
+
+# the device priority tiers by priority file.
+_priorities: Dict[str, Dict[str, int]] = dict()
+
+
+def priority_tier(device, config) -> int:
+    """
+    Returns the priority tier of the device, 0 being the highest priority.  The
+    tiers are read from the config.poll_priority_file CSV ("host" and "priority"
+    columns, for example the inventory file); devices not found in the file are
+    in the config.poll_priority_default tier.
+    """
+    if not (path := config.poll_priority_file):
+        return config.poll_priority_default
+
+    if (tiers := _priorities.get(path)) is None:
+        with open(path, newline="") as ifile:
+            tiers = _priorities[path] = {
+                rec["host"]: int(rec["priority"])
+                for rec in csv.DictReader(ifile)
+                if rec.get("priority")
+            }
+
+    return tiers.get(device.name, config.poll_priority_default)
+
+
+@asynccontextmanager
+async def poll_slot(device, config):
+    """
+    Async context manager used by the interfaces collectors to wrap the device
+    poll.  When config.poll_stagger is set, the poll is delayed by the device
+    phase offset; when config.poll_concurrency is set, the number of in-flight
+    polls across all devices is limited to that value, with the free slots
+    given to the higher priority devices first.
+
+    When config.poll_shed_wait is set, the polls of the devices below the top
+    priority tier that cannot get a slot within that many seconds raise
+    PollShed.
+    """
+    global _poll_slots
+
+    ifs = device.private["interfaces"]
+    ifs["tier"] = tier = priority_tier(device, config)
+
+    if config.poll_stagger:
+        await asyncio.sleep(phase_offset(device.name, config.poll_stagger))
+
+    if not config.poll_concurrency:
+        yield
+        return
+
+    if _poll_slots is None:
+        _poll_slots = PrioritySlots(config.poll_concurrency)
+
+    timeout = config.poll_shed_wait if tier > 0 else None
+
+    if not await _poll_slots.acquire(tier, timeout):
+        raise PollShed()
+
+    try:
+        yield
+    finally:
+        _poll_slots.release()
+
+
+def poll_shed(device, timestamp) -> List[interfaces.InterfacesPollSkippedMetric]:
+    """
+    Called by the interfaces collectors when the device poll is shed, returns
+    the skipped-poll metric; the value is the number of polls of the device
+    shed since the collector started.
+    """
+    ifs = device.private["interfaces"]
+    ifs["skipped"] = skipped = ifs.get("skipped", 0) + 1
+
+    device.log.debug(
+        f"{device.name}: poll skipped, no poll slot free within the shed wait"
+    )
+
+    return [
+        interfaces.InterfacesPollSkippedMetric(
+            value=skipped,
+            ts=timestamp,
+            tags=dict(reason="shed", tier=str(ifs["tier"])),
+        )
+    ]
+
+
+# -----------------------------------------------------------------------------
+#
+#                               Circuit Breaker
+#
+# -----------------------------------------------------------------------------
+
+
+class CircuitBreaker(object):
+    """
+    Per-device failure tracker.  After `threshold` consecutive failed polls the
+    breaker "opens" and polls are skipped for the backoff period, which doubles
+    on each further failure up to `backoff_max` seconds.  When the backoff
+    period expires the breaker is "half-open" and allows a single probe poll;
+    a successful probe closes the breaker, a failed one re-opens it.
+    """
+
+    def __init__(self, threshold: int, backoff: int, backoff_max: int):
+        self.threshold = threshold
+        self.backoff_base = backoff
+        self.backoff_max = backoff_max
+        self.failures = 0
+        self.backoff = 0
+        self.open_until = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        return self.failures >= self.threshold
+
+    def allow(self) -> bool:
+        """ returns True if the device should be polled now """
+        return not self.is_open or time.monotonic() >= self.open_until
+
+    def failed(self) -> bool:
+        """ record a failed poll, returns True if the breaker is (re-)opened """
+        self.failures += 1
+
+        if not self.is_open:
+            return False
+
+        exp = self.failures - self.threshold
+        self.backoff = min(self.backoff_base * 2 ** exp, self.backoff_max)
+        self.open_until = time.monotonic() + self.backoff
+        return True
+
+    def succeeded(self):
+        """ record a successful poll, closing the breaker """
+        self.failures = 0
+        self.backoff = 0
+
+
+def circuit_breaker(config) -> Optional[CircuitBreaker]:
+    """
+    Returns the circuit breaker for a device given the interfaces collector
+    configuration, or None if the circuit breaker is not enabled.
+    """
+    if not config.breaker_threshold:
+        return None
+
+    return CircuitBreaker(
+        threshold=config.breaker_threshold,
+        backoff=config.breaker_backoff,
+        backoff_max=config.breaker_backoff_max,
+    )
+
+
+def poll_failed(device):
+    """
+    Called by the interfaces collectors when a device poll fails.  If the
+    circuit breaker opens then the consumer collectors are told that the
+    interface data is not available, and are woken up so they stop waiting on
+    the device.
+    """
+    ifs = device.private["interfaces"]
+
+    if (breaker := ifs["breaker"]) is None or not breaker.failed():
+        return
+
+    device.log.warning(
+        f"{device.name}: {breaker.failures} failed polls, "
+        f"suspending interfaces collection for {breaker.backoff}s"
+    )
+
+    ifs["available"] = False
+    ifs["event"].set()
+
+
+def poll_succeeded(device):
+    """
+    Called by the interfaces collectors when a device poll succeeds.
+    """
+    ifs = device.private["interfaces"]
+    ifs["available"] = True
+
+    if breaker := ifs["breaker"]:
+        breaker.succeeded()
+
+
+# -----------------------------------------------------------------------------
+#
+#                               Poll Deadline
+#
+# -----------------------------------------------------------------------------
+
+
+class PollDeadline(object):
+    """
+    The deadline budget for a single device poll, as configured by
+    config.poll_timeout.  The budget starts with the first fetch, so time spent
+    waiting for a poll slot is not counted.  When no timeout is configured the
+    fetches are not limited.
+    """
+
+    def __init__(self, config):
+        self.timeout = config.poll_timeout
+        self.fetch_timeout = (
+            config.poll_timeout * (1 - config.poll_parse_share)
+            if config.poll_timeout
+            else None
+        )
+        self.start = None
+        self.partial = False
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start if self.start else 0.0
+
+    def remaining(self) -> Optional[float]:
+        """ returns the remaining fetch budget in seconds, or None if unlimited """
+        if self.fetch_timeout is None:
+            return None
+
+        return max(self.fetch_timeout - self.elapsed, 0)
+
+    async def fetch(self, aw: Awaitable):
+        """
+        Await the fetch within the remaining fetch budget, raising
+        asyncio.TimeoutError if the deadline is exceeded.
+        """
+        if self.start is None:
+            self.start = time.monotonic()
+
+        return await asyncio.wait_for(aw, timeout=self.remaining())
+
+    async def fetch_partial(self, *aws: Awaitable) -> List:
+        """
+        Await all of the fetches within the remaining fetch budget.  The results
+        are returned in the same order, with None for each fetch that did not
+        complete in time; in which case the poll is marked as partial.
+        """
+        if self.start is None:
+            self.start = time.monotonic()
+
+        tasks = [asyncio.ensure_future(aw) for aw in aws]
+        done, pending = await asyncio.wait(tasks, timeout=self.remaining())
+
+        for task in pending:
+            task.cancel()
+
+        self.partial = bool(pending)
+        return [task.result() if task in done else None for task in tasks]
+
+    def overrun(
+        self, timestamp, phase: str
+    ) -> List[interfaces.InterfacesPollOverrunMetric]:
+        """
+        Returns the overrun metric for the given poll phase ("fetch", "parse") if
+        the poll exceeded its deadline, or an empty list otherwise.
+        """
+        if not self.timeout:
+            return []
+
+        limit = self.fetch_timeout if phase == "fetch" else self.timeout
+        if (elapsed := self.elapsed) < limit:
+            return []
+
+        return [
+            interfaces.InterfacesPollOverrunMetric(
+                value=round(elapsed, 3), ts=timestamp, tags=dict(phase=phase)
+            )
+        ]
@@ -0,0 +1,251 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the on-demand profiler of the collector polls, toggled at
+runtime without restarting the collectors.
+
+A profiling session is started by either:
+
+    * sending the SIGUSR2 signal to the process; all collectors and devices
+      are profiled for DEFAULT_POLLS polls, and the profiles are written to the
+      current directory.
+
+    * writing the control file identified by the environment variable
+      NETPACA_PROFILE, checked for changes every few seconds.  The file is
+      JSON, all keys optional:
+
+        {"polls": 20, "collectors": ["link-uptime"], "devices": ["sw1"],
+         "output_dir": "/tmp"}
+
+During the session, the polls of the selected collectors and devices are run
+with cProfile enabled, and the call stacks are sampled with the SIGPROF
+interval timer.  Since the collectors share the event loop, the profiles
+include the code that runs while a selected poll is in flight.  At the end of
+the session the profiles are written as "netpaca-<time>.pstats" (for pstats
+and snakeviz) and "netpaca-<time>.collapsed" (for flamegraph.pl and
+speedscope).
+
+When no session is active the cost per poll is a comparison of the time with
+the next control file check.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Optional, Iterable
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+import cProfile
+import json
+import os
+import signal
+import time
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = ["CONTROL_ENV", "DEFAULT_POLLS", "ProfileSession", "session_for"]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+CONTROL_ENV = "NETPACA_PROFILE"
+DEFAULT_POLLS = 10
+
+# the number of seconds between the checks of the control file.
+_CONTROL_CHECK_INTERVAL = 5
+
+# the stack sampling interval in seconds of CPU time.
+_SAMPLE_INTERVAL = 0.005
+
+
+class ProfileSession(object):
+    """
+    A profiling session of the selected collectors and devices, for a number of
+    polls.
+
+    Parameters
+    ----------
+    polls: int
+        The number of polls to profile
+
+    collectors: list
+        The collector names to profile, all when not given
+
+    devices: list
+        The device names to profile, all when not given
+
+    output_dir: str
+        The directory of the profile files
+    """
+
+    def __init__(
+        self,
+        polls: int = DEFAULT_POLLS,
+        collectors: Optional[Iterable[str]] = None,
+        devices: Optional[Iterable[str]] = None,
+        output_dir: str = ".",
+    ):
+        self.polls = polls
+        self.collectors = frozenset(collectors) if collectors else None
+        self.devices = frozenset(devices) if devices else None
+        self.output_dir = Path(output_dir)
+        self.profiler = cProfile.Profile()
+        self.stacks = Counter()
+        self._in_flight = 0
+
+    def wants(self, collector: str, device) -> bool:
+        """ returns True if the collector poll of the device is profiled """
+        return (self.collectors is None or collector in self.collectors) and (
+            self.devices is None or device.name in self.devices
+        )
+
+    def _sample(self, signum, frame):  # noqa
+        stack = list()
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({Path(code.co_filename).name})")
+            frame = frame.f_back
+
+        self.stacks[";".join(reversed(stack))] += 1
+
+    def _start(self):
+        signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, _SAMPLE_INTERVAL, _SAMPLE_INTERVAL)
+        self.profiler.enable()
+
+    def _stop(self):
+        self.profiler.disable()
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, signal.SIG_DFL)
+
+    @contextmanager
+    def profile(self):
+        """ context manager enclosing a profiled collector poll """
+        if self._in_flight == 0:
+            self._start()
+
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self.polls -= 1
+
+            if self._in_flight == 0:
+                self._stop()
+                if self.polls <= 0:
+                    self.write()
+                    _end_session(self)
+
+    def write(self) -> Path:
+        """ write the profiles, returns the path without the suffix """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / time.strftime("netpaca-%Y%m%d-%H%M%S")
+
+        self.profiler.dump_stats(path.with_suffix(".pstats"))
+        with path.with_suffix(".collapsed").open("w") as ofile:
+            for stack, count in self.stacks.most_common():
+                ofile.write(f"{stack} {count}\n")
+
+        return path
+
+
+# -----------------------------------------------------------------------------
+#                              Session Control
+# -----------------------------------------------------------------------------
+
+_session: Optional[ProfileSession] = None
+_signalled = False
+_installed = False
+_control_mtime = None
+_next_check = 0.0
+
+
+def _on_signal(signum, frame):  # noqa
+    global _signalled
+    _signalled = True
+
+
+def _install():
+    global _installed
+    _installed = True
+
+    try:
+        signal.signal(signal.SIGUSR2, _on_signal)
+    except ValueError:
+        # not the main thread; only the control file can be used.
+        pass
+
+
+def _end_session(session: ProfileSession):
+    global _session
+    if _session is session:
+        _session = None
+
+
+def _check_control():
+    global _session, _signalled, _control_mtime, _next_check
+
+    if _signalled:
+        _signalled = False
+        if _session is None:
+            _session = ProfileSession()
+
+    if not (control := os.environ.get(CONTROL_ENV)):
+        return
+
+    _next_check = time.monotonic() + _CONTROL_CHECK_INTERVAL
+
+    try:
+        control = Path(control)
+        if (mtime := control.stat().st_mtime) == _control_mtime:
+            return
+        _control_mtime = mtime
+        options = json.loads(control.read_text() or "{}")
+    except (OSError, ValueError):
+        return
+
+    if _session is None:
+        _session = ProfileSession(
+            polls=options.get("polls", DEFAULT_POLLS),
+            collectors=options.get("collectors"),
+            devices=options.get("devices"),
+            output_dir=options.get("output_dir", str(control.parent)),
+        )
+
+
+def session_for(collector: str, device) -> Optional[ProfileSession]:
+    """
+    Returns the active profiling session if the collector poll of the device is
+    to be profiled, otherwise None.
+    """
+    if not _installed:
+        _install()
+
+    if _signalled or time.monotonic() >= _next_check:
+        _check_control()
+
+    if _session is None or not _session.wants(collector, device):
+        return None
+
+    return _session
@@ -0,0 +1,247 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the record-and-replay support for the interfaces collectors,
+used for offline load testing.
+
+Capture
+-------
+When the interfaces collector config.capture_dir is set, each raw device
+response is appended to the file "<capture_dir>/<device-name>.jsonl" along
+with the time taken to obtain it.  Each record has one of the response keys:
+
+    "json": EAPI output
+    "xml":  NXAPI output
+    "text": NX-OS SSH command output
+    "snmp": IOS SNMP values {"sys_uptime", "snmp_uptime", "tables"}
+
+Replay
+------
+When the interfaces collector config.replay_dir is set, the device transport
+(eapi, nxapi, or the SSH driver) is replaced by a stand-in that serves the
+recorded responses in order, repeating when exhausted, with the recorded
+latency (scaled by config.replay_latency_scale).  Link flaps are injected
+into each response at the rate config.replay_flap_rate (per interface, per
+response).  The `ReplayDevice` class is a stand-in Device for running the
+collectors without a device driver.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Optional, List, Dict
+from types import SimpleNamespace
+from itertools import cycle
+from copy import deepcopy
+from pathlib import Path
+import asyncio
+import json
+import logging
+import random
+import re
+import time
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = ["capture", "Replay", "ReplayDevice", "attach"]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                   Capture
+# -----------------------------------------------------------------------------
+
+
+def capture(device, config, elapsed: float, **response):
+    """
+    Record the raw device response when capture is enabled.
+
+    Parameters
+    ----------
+    device:
+        The device driver instance
+
+    config:
+        The interfaces collector configuration
+
+    elapsed: float
+        The time, in seconds, taken to obtain the response
+
+    response:
+        One of json=, xml=, text=, snmp= as described in the module docstring.
+        The xml value is an lxml element.
+    """
+    if not config.capture_dir:
+        return
+
+    if (xml := response.get("xml")) is not None:
+        from lxml import etree
+
+        response["xml"] = etree.tostring(xml, encoding="unicode")
+
+    rec = dict(ts=time.time(), elapsed=round(elapsed, 6), **response)
+    path = Path(config.capture_dir) / f"{device.name}.jsonl"
+
+    with path.open("a") as ofile:
+        ofile.write(json.dumps(rec) + "\n")
+
+
+# -----------------------------------------------------------------------------
+#                                   Replay
+# -----------------------------------------------------------------------------
+
+_re_xml_flapped = re.compile(r"<eth_link_flapped>[^<]*</eth_link_flapped>")
+
+
+class Replay(object):
+    """
+    Serves the recorded responses of a single device capture file.
+    """
+
+    def __init__(
+        self, path: Path, latency_scale: float = 1.0, flap_rate: float = 0.0
+    ):
+        self.path = Path(path)
+        self.records = [json.loads(line) for line in self.path.open()]
+        if not self.records:
+            raise ValueError(f"{self.path}: no recorded responses")
+
+        self.latency_scale = latency_scale
+        self.flap_rate = flap_rate
+        self._records = cycle(self.records)
+
+    def _flap(self) -> bool:
+        return self.flap_rate and random.random() < self.flap_rate
+
+    async def next(self) -> Dict:
+        """ returns the next recorded response, after the recorded latency """
+        rec = next(self._records)
+        await asyncio.sleep(rec["elapsed"] * self.latency_scale)
+        return rec
+
+    async def json(self) -> Dict:
+        rec = await self.next()
+        if not self.flap_rate:
+            return rec["json"]
+
+        output = deepcopy(rec["json"])
+
+        for if_data in output["interfaces"].values():
+            if self._flap():
+                if_data["lastStatusChangeTimestamp"] = time.time()
+
+        return output
+
+    async def text(self, key: str = "text") -> str:
+        rec = await self.next()
+        return _re_xml_flapped.sub(
+            lambda mo: (
+                "<eth_link_flapped>00:00:01</eth_link_flapped>"
+                if self._flap()
+                else mo.group(0)
+            ),
+            rec[key],
+        )
+
+    async def xml(self):
+        from lxml import etree
+
+        return etree.fromstring(await self.text("xml"))
+
+    async def snmp(self) -> Dict:
+        rec = await self.next()
+        snmp = rec["snmp"]
+        name_t, alias_t, oper_t, lastchange_t = snmp["tables"]
+
+        lastchange_t = {
+            if_idx: snmp["sys_uptime"] if self._flap() else value
+            for if_idx, value in lastchange_t.items()
+        }
+
+        return dict(
+            sys_uptime=snmp["sys_uptime"],
+            snmp_uptime=snmp["snmp_uptime"],
+            tables=[name_t, alias_t, oper_t, lastchange_t],
+        )
+
+
+class _ReplayAPI(object):
+    """ stand-in for the device eapi / nxapi transport """
+
+    def __init__(self, replay: Replay, get_output):
+        self.replay = replay
+        self.get_output = get_output
+
+    async def exec(self, commands: List[str]):  # noqa
+        output = await self.get_output()
+        return [SimpleNamespace(ok=True, output=output)]
+
+
+class _ReplaySSH(object):
+    """ stand-in for the device SSH driver """
+
+    def __init__(self, replay: Replay):
+        self.replay = replay
+
+    async def send_command(self, command: str):  # noqa
+        return SimpleNamespace(failed=False, result=await self.replay.text())
+
+
+def attach(device, config) -> Optional[Replay]:
+    """
+    Replace the device transport with the replay stand-in when replay is
+    enabled by config.replay_dir.  The Replay instance is stored in the device
+    private area as "replay" (which the IOS SNMP collector uses directly).
+    """
+    if not config.replay_dir:
+        return None
+
+    replay = device.private["replay"] = Replay(
+        Path(config.replay_dir) / f"{device.name}.jsonl",
+        latency_scale=config.replay_latency_scale,
+        flap_rate=config.replay_flap_rate,
+    )
+
+    first = replay.records[0]
+
+    if "json" in first:
+        device.eapi = _ReplayAPI(replay, replay.json)
+    elif "xml" in first:
+        device.nxapi = _ReplayAPI(replay, replay.xml)
+    elif "text" in first:
+        device.driver = _ReplaySSH(replay)
+
+    device.log.info(f"{device.name}: replaying {len(replay.records)} responses")
+    return replay
+
+
+class ReplayDevice(object):
+    """
+    Stand-in Device used to run the collectors from a capture file without a
+    device driver.
+    """
+
+    def __init__(self, name: str, log: Optional[logging.Logger] = None):
+        self.name = name
+        self.log = log or logging.getLogger(__name__)
+        self.private = dict()
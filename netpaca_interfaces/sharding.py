@@ -0,0 +1,281 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the sharded and cluster run mode support.
+
+Sharded Mode
+------------
+The device inventory is hashed across N worker processes, each running its own
+netpaca process (and event loop) with the collectors of this package.  A worker
+identifies its shard with the environment variable
+NETPACA_SHARD="<index>/<count>", and the collectors are only started for the
+devices owned by the worker; all of the per-device collector state therefore
+stays local to that worker.
+
+The workers are started with:
+
+    python -m netpaca_interfaces.sharding --workers 32 -- netpaca <args>
+
+Cluster Mode
+------------
+Multiple collector nodes (for example containers) agree on device ownership
+using consistent hashing over a shared member list.  The member list is a file
+with one node name per line, identified by the environment variable
+NETPACA_CLUSTER; each node identifies itself by NETPACA_NODE.  The file is
+re-read when it changes, so that nodes can join or leave; consistent hashing
+ensures only the devices of the joining or leaving node are moved.
+
+In the cluster mode, each node starts the collectors for all devices and
+checks ownership on each poll.  When a node loses ownership of a device, the
+last normalized interface snapshot is handed off in the "handoff" directory
+next to the member list file; the new owner loads it on its first poll.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Optional, Tuple, List, Dict
+from bisect import bisect
+from pathlib import Path
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import zlib
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = [
+    "SHARD_ENV",
+    "CLUSTER_ENV",
+    "NODE_ENV",
+    "shard_of",
+    "owns",
+    "HashRing",
+    "cluster_mode",
+    "cluster_owns",
+]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+SHARD_ENV = "NETPACA_SHARD"
+CLUSTER_ENV = "NETPACA_CLUSTER"
+NODE_ENV = "NETPACA_NODE"
+
+# the number of virtual nodes per cluster member on the hash ring.
+_RING_VNODES = 64
+
+# the minimum number of seconds between checks of the member list file.
+_MEMBERS_CHECK_INTERVAL = 5
+
+
+def shard_of(name: str, count: int) -> int:
+    """ returns the shard index of the device name """
+    return zlib.crc32(name.encode()) % count
+
+
+def _this_shard() -> Optional[Tuple[int, int]]:
+    if not (value := os.environ.get(SHARD_ENV)):
+        return None
+
+    index, count = map(int, value.split("/"))
+    return index, count
+
+
+def owns(device) -> bool:
+    """
+    Returns True if the device is owned by this worker process, which is always
+    the case when not running in the sharded mode.
+    """
+    if (shard := _this_shard()) is None:
+        return True
+
+    index, count = shard
+    return shard_of(device.name, count) == index
+
+
+# -----------------------------------------------------------------------------
+#
+#                                 Cluster Mode
+#
+# -----------------------------------------------------------------------------
+
+
+class HashRing(object):
+    """
+    Consistent hash ring of the cluster members, using virtual nodes so that
+    the devices are evenly spread.
+    """
+
+    def __init__(self, members: List[str], vnodes: int = _RING_VNODES):
+        self.members = sorted(set(members))
+        ring = sorted(
+            (zlib.crc32(f"{member}#{vnode}".encode()), member)
+            for member in self.members
+            for vnode in range(vnodes)
+        )
+        self._hashes = [point for point, _ in ring]
+        self._owners = [member for _, member in ring]
+
+    def owner(self, name: str) -> Optional[str]:
+        """ returns the member that owns the device name """
+        if not self._owners:
+            return None
+
+        idx = bisect(self._hashes, zlib.crc32(name.encode())) % len(self._hashes)
+        return self._owners[idx]
+
+
+class _Cluster(object):
+    """ the cluster membership, as read from the member list file """
+
+    def __init__(self, path: Path, node: str):
+        self.path = path
+        self.node = node
+        self.handoff_dir = path.parent / "handoff"
+        self.ring = HashRing([])
+        self._mtime = None
+        self._checked = 0.0
+
+    def refresh(self):
+        if (now := time.monotonic()) - self._checked < _MEMBERS_CHECK_INTERVAL:
+            return
+
+        self._checked = now
+
+        try:
+            if (mtime := self.path.stat().st_mtime) == self._mtime:
+                return
+            members = self.path.read_text().split()
+        except OSError:
+            return
+
+        self._mtime = mtime
+        self.ring = HashRing(members)
+
+    def owns(self, name: str) -> bool:
+        self.refresh()
+        return self.ring.owner(name) == self.node
+
+    def handoff(self, name: str, snapshot: Dict):
+        self.handoff_dir.mkdir(exist_ok=True)
+        (self.handoff_dir / f"{name}.json").write_text(json.dumps(snapshot))
+
+    def takeover(self, name: str) -> Optional[Dict]:
+        path = self.handoff_dir / f"{name}.json"
+        try:
+            snapshot = json.loads(path.read_text())
+            path.unlink()
+            return snapshot
+        except (OSError, ValueError):
+            return None
+
+
+_cluster: Optional[_Cluster] = None
+
+
+def cluster_mode() -> bool:
+    """ returns True if running in the cluster mode """
+    global _cluster
+
+    if _cluster is None and (members := os.environ.get(CLUSTER_ENV)):
+        _cluster = _Cluster(Path(members), os.environ[NODE_ENV])
+
+    return _cluster is not None
+
+
+def cluster_owns(device) -> bool:
+    """
+    Called by the interfaces collectors on each poll, returns True if the
+    device is owned by this node (always the case when not in the cluster
+    mode).  On a change of ownership the interface snapshot is handed off to,
+    or taken over from, the other node.  When the device is not owned the
+    interface data is marked as not available, so that the consumer
+    collectors do not report metrics for the device.
+    """
+    if not cluster_mode():
+        return True
+
+    ifs = device.private["interfaces"]
+    owned = _cluster.owns(device.name)
+
+    if owned == ifs.get("cluster_owned"):
+        return owned
+
+    ifs["cluster_owned"] = owned
+
+    if owned:
+        if (snapshot := _cluster.takeover(device.name)) is not None:
+            ifs["snapshot"] = snapshot
+        device.log.info(f"{device.name}: owned by cluster node {_cluster.node}")
+        return True
+
+    if (snapshot := ifs.get("snapshot")) is not None:
+        _cluster.handoff(device.name, snapshot)
+
+    device.log.info(f"{device.name}: released by cluster node {_cluster.node}")
+    ifs["available"] = False
+    ifs["event"].set()
+    return False
+
+
+# -----------------------------------------------------------------------------
+#
+#                               Worker Launcher
+#
+# -----------------------------------------------------------------------------
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="run the netpaca command as N sharded worker processes"
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("command", nargs=argparse.REMAINDER)
+    args = parser.parse_args()
+
+    if not (command := [arg for arg in args.command if arg != "--"]):
+        parser.error("missing netpaca command")
+
+    workers = [
+        subprocess.Popen(
+            command, env=dict(os.environ, **{SHARD_ENV: f"{index}/{args.workers}"})
+        )
+        for index in range(args.workers)
+    ]
+
+    def stop_workers(signum, frame):  # noqa
+        for proc in workers:
+            proc.send_signal(signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop_workers)
+    signal.signal(signal.SIGINT, stop_workers)
+
+    sys.exit(max(proc.wait() for proc in workers))
+
+
+if __name__ == "__main__":
+    main()
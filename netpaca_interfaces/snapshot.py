@@ -0,0 +1,257 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the normalized interface snapshot support.  The raw
+interface data stored by the interfaces collectors is platform specific (EAPI
+JSON, NX-OS XML, IOS SNMP tables); the normalized snapshot is the same for all
+platforms, keyed by interface name:
+
+    {
+        "Ethernet1": {"link_up": True, "last_change": 1594312345.0, "desc": "..."}
+    }
+
+The "last_change" value is seconds since epoch for EOS and NX-OS, and the
+ifLastChange sysUpTime ticks for IOS; None if the link never changed.  For
+NX-OS the value is derived from the relative "eth_link_flapped" duration and
+the poll time, and so has the resolution of that format ("3d04h" is only
+accurate to the hour).  A value within that resolution of the prior snapshot
+value is the same flap, and the prior value is retained; so the snapshot only
+changes when the link flaps.
+
+The normalized snapshot is stored in the device private "interfaces" area as
+"snapshot", and the prior one as "prev_snapshot".  When the interfaces
+collector config.snapshot_store is set, the snapshots are persisted so that
+after a restart the first snapshot of each device has the stored one as its
+prior snapshot.
+
+Delta
+-----
+Each new snapshot is compared with the prior one, and the `SnapshotDelta` is
+stored as "delta" (None when there is no prior snapshot).  Consumers that only
+need the changes can `subscribe` to the device; the subscriber callables are
+called with the device and the delta on each poll that changed an interface.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Optional, Dict, Set, Callable, Tuple
+from dataclasses import dataclass, field
+import re
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca_interfaces import sharding, persist
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = [
+    "SnapshotDelta",
+    "wanted",
+    "prior",
+    "store",
+    "diff",
+    "subscribe",
+    "normalize_eapi",
+    "normalize_nxos",
+    "normalize_ios",
+]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+_re_timestamp = re.compile(r"(?P<H>\d+):(?P<M>\d\d):(?P<S>\d\d)$")
+_re_duration = re.compile(
+    r"(\d+)\s*(year|week|day|hour|min|sec|[ywdhms])[a-z]*(?:\(s\))?"
+)
+
+_DURATION_UNITS = {
+    "y": 365 * 86400,
+    "w": 7 * 86400,
+    "d": 86400,
+    "h": 3600,
+    "m": 60,
+    "s": 1,
+}
+
+# the allowance, in seconds, for the difference between the device time of the
+# "eth_link_flapped" value and the poll time.
+
+_FLAP_SLACK = 5
+
+
+@dataclass
+class SnapshotDelta:
+    """
+    The interface changes between two consecutive snapshots.  The `changed`
+    value maps the interface name to the names of the changed fields.
+    """
+
+    added: Set[str] = field(default_factory=set)
+    removed: Set[str] = field(default_factory=set)
+    changed: Dict[str, Set[str]] = field(default_factory=dict)
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+
+def diff(prev: Dict[str, Dict], curr: Dict[str, Dict]) -> SnapshotDelta:
+    """ returns the delta between the prior and the current snapshot """
+    delta = SnapshotDelta(removed=prev.keys() - curr.keys())
+
+    for if_name, rec in curr.items():
+        if (prev_rec := prev.get(if_name)) is None:
+            delta.added.add(if_name)
+        elif rec != prev_rec:
+            delta.changed[if_name] = {
+                key for key, value in rec.items() if prev_rec.get(key) != value
+            }
+
+    return delta
+
+
+def subscribe(device, callback: Callable[[object, SnapshotDelta], None]):
+    """
+    Subscribe to the interface changes of the device.  The callback is called
+    with the device and the `SnapshotDelta` for each poll with changes.
+    """
+    device.private.setdefault("snapshot_subscribers", list()).append(callback)
+
+
+def wanted(device, config) -> bool:
+    """
+    Returns True if the normalized snapshot should be maintained by the
+    interfaces collector, as it is only needed by some features.
+    """
+    return (
+        bool(config.snapshot_store)
+        or bool(device.private.get("snapshot_subscribers"))
+        or sharding.cluster_mode()
+    )
+
+
+def prior(device, config) -> Optional[Dict[str, Dict]]:
+    """ returns the prior normalized snapshot of the device, if any """
+    ifs = device.private["interfaces"]
+
+    # warm-start: the first snapshot since the collector started uses the
+    # persisted snapshot as its prior snapshot.
+
+    if "snapshot" not in ifs and (db := persist.get_store(config)):
+        ifs["snapshot"] = db.load(device.name)
+
+    return ifs.get("snapshot")
+
+
+def store(device, config, snapshot: Dict[str, Dict]):
+    """ store the new normalized snapshot, retaining the prior one """
+    ifs = device.private["interfaces"]
+    db = persist.get_store(config)
+
+    prev = ifs["prev_snapshot"] = prior(device, config)
+    ifs["snapshot"] = snapshot
+    delta = ifs["delta"] = diff(prev, snapshot) if prev is not None else None
+
+    if db:
+        db.put(device.name, snapshot)
+
+    if delta:
+        for callback in device.private.get("snapshot_subscribers", ()):
+            callback(device, delta)
+
+
+def normalize_eapi(data: Dict) -> Dict[str, Dict]:
+    """ normalize the EAPI "show interfaces" output """
+    return {
+        if_name: {
+            "link_up": if_data["interfaceStatus"] == "connected",
+            "last_change": if_data.get("lastStatusChangeTimestamp"),
+            "desc": if_data.get("description", ""),
+        }
+        for if_name, if_data in data["interfaces"].items()
+    }
+
+
+def _flapped(last_flapped: Optional[str]) -> Optional[Tuple[int, int]]:
+    """
+    Returns the NX-OS "eth_link_flapped" duration in seconds and the resolution
+    of its format in seconds, or None if the link never flapped.
+    """
+    if not last_flapped or last_flapped == "never":
+        return None
+
+    if (mo := _re_timestamp.match(last_flapped)) is not None:
+        hours, minutes, seconds = map(int, mo.groups())
+        return hours * 3600 + minutes * 60 + seconds, 1
+
+    if not (parts := _re_duration.findall(last_flapped)):
+        return None
+
+    units = [_DURATION_UNITS[unit[0]] for _, unit in parts]
+    return sum(int(num) * unit for (num, _), unit in zip(parts, units)), min(units)
+
+
+def normalize_nxos(
+    xml, now: float, prev: Optional[Dict[str, Dict]] = None
+) -> Dict[str, Dict]:
+    """
+    normalize the NX-OS "show interface" XML, polled at the time `now`.  The
+    last_change of the prior snapshot `prev` is retained when the new value is
+    within the resolution of the "eth_link_flapped" format.
+    """
+    snapshot = dict()
+
+    for rec in xml.xpath("TABLE_interface/ROW_interface"):
+        if_name = rec.findtext("interface")
+        last_change = None
+
+        if (flapped := _flapped(rec.findtext("eth_link_flapped"))) is not None:
+            seconds, resolution = flapped
+            last_change = float(int(now) - seconds)
+            prev_change = ((prev or {}).get(if_name) or {}).get("last_change")
+            if (
+                prev_change is not None
+                and abs(last_change - prev_change) < resolution + _FLAP_SLACK
+            ):
+                last_change = prev_change
+
+        snapshot[if_name] = {
+            "link_up": rec.findtext("state") == "up",
+            "last_change": last_change,
+            "desc": rec.findtext("desc") or "",
+        }
+
+    return snapshot
+
+
+def normalize_ios(data: Dict[str, Dict]) -> Dict[str, Dict]:
+    """ normalize the IOS SNMP interface data """
+    return {
+        if_name: {
+            "link_up": bool(rec["if_link_up"]),
+            "last_change": rec["if_lastchange"] or None,
+            "desc": rec["if_desc"] or "",
+        }
+        for if_name, rec in data.items()
+    }
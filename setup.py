@@ -44,10 +44,12 @@ setup(
     packages=find_packages(),
     include_package_data=True,
     install_requires=requirements(),
+    extras_require={"numpy": ["numpy"]},
     entry_points={
         "netpaca.collectors": [
             "interfaces = netpaca_interfaces:InterfaceRawCollectorType",
             "link_uptime = netpaca_interfaces.link_uptime:LinkUptimeCollectorType",
+            "if_rates = netpaca_interfaces.if_rates:IfRatesCollectorType",
         ],
     },
     classifiers=[
@@ -42,3 +42,67 @@ def clean(ctx):
     ctx.run("rm -rf netcfgbu.egg-info")
     ctx.run("rm -rf .pytest_cache .pytest_tmpdir .coverage")
     ctx.run("rm -rf htmlcov")
+
+
+@task
+def bench_stagger(ctx, devices=5000, interval=60):
+    """
+    Show the number of device polls started per second of the collection
+    interval, without and with the per-device phase offset (poll_stagger).
+    """
+    from collections import Counter
+    from netpaca_interfaces.polling import phase_offset
+
+    names = [f"device-{num:05}" for num in range(devices)]
+    stagger = Counter(int(phase_offset(name, interval)) for name in names)
+
+    print(f"{devices} devices, {interval}s interval")
+    print(f"  no stagger: peak {devices} polls/sec, 1 busy second")
+    print(
+        f"  staggered:  peak {max(stagger.values())} polls/sec, "
+        f"mean {devices / interval:.1f} polls/sec, {len(stagger)} busy seconds"
+    )
+
+
+@task
+def bench(ctx, save=False, compare=False):
+    """
+    Run the collector parser benchmarks, optionally saving the results as the
+    baseline or comparing the results to the saved baseline.
+    """
+    opts = " ".join(
+        opt for opt, enabled in [("--save", save), ("--compare", compare)] if enabled
+    )
+    ctx.run(f"python benchmarks/parsers.py {opts}", pty=True)
+
+
+@task
+def bench_fleet(ctx, platform="eapi", devices="100,500,1000,2000", duration=30):
+    """
+    Run the synthetic fleet benchmark and report the capacity curve for the
+    platform.
+    """
+    ctx.run(
+        f"python benchmarks/fleet.py --platform {platform} "
+        f"--devices {devices} --duration {duration}",
+        pty=True,
+    )
+
+
+@task
+def bench_uptime(ctx):
+    """
+    Compare the Python and NumPy link uptime computations at 1k and 10k
+    interfaces.
+    """
+    ctx.run("python benchmarks/uptime.py", pty=True)
+
+
+@task
+def bench_imports(ctx, platform=None):
+    """
+    Report the import time and RSS of the collector modules per platform, at
+    startup and after the first device poll.
+    """
+    opts = f"--platform {platform}" if platform else ""
+    ctx.run(f"python benchmarks/imports.py {opts}", pty=True)
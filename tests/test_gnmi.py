@@ -0,0 +1,183 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Tests for the gNMI streaming interfaces collectors, run against a local
+stand-in gNMI server that streams the notifications pushed by the test.
+"""
+
+from types import SimpleNamespace
+import asyncio
+import logging
+import time
+
+import pytest
+
+pytest.importorskip("netpaca")
+pytest.importorskip("maya")
+pytest.importorskip("lxml")
+
+import netpaca_interfaces as interfaces  # noqa: E402
+from netpaca_interfaces import gnmi, eapi_gnmi, nxapi_gnmi  # noqa: E402
+
+NS = 1_000_000_000
+
+
+class GnmiServer(object):
+    """
+    A local stand-in for the device gNMI server, with the `subscribe` contract
+    of the device driver gnmi client.  The notifications pushed by the test are
+    streamed to the subscriber; a pushed exception fails the subscription.
+    """
+
+    def __init__(self):
+        self.queue = asyncio.Queue()
+        self.subscriptions = list()
+
+    def push(self, item):
+        self.queue.put_nowait(item)
+
+    async def subscribe(self, paths, mode):
+        self.subscriptions.append((paths, mode))
+        while True:
+            if isinstance(item := await self.queue.get(), Exception):
+                raise item
+            yield item
+
+    async def drained(self):
+        while not self.queue.empty():
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+
+def _update(if_name, leaf, val):
+    return dict(path=f"interfaces/interface[name={if_name}]/state/{leaf}", val=val)
+
+
+def _device(server):
+    return SimpleNamespace(
+        name="gnmi-1", log=logging.getLogger("test"), private={}, gnmi=server
+    )
+
+
+async def _subscribed(device, *notifications):
+    """ run the subscription to the stand-in server over the notifications """
+    store = dict()
+    device.private["interfaces"] = {"event": asyncio.Event(), "gnmi": store}
+    task = asyncio.create_task(gnmi.run_subscription(device, store))
+
+    for notification in notifications:
+        device.gnmi.push(notification)
+
+    await device.gnmi.drained()
+    task.cancel()
+    return store
+
+
+LAST_CHANGE = int((time.time() - 3600) * NS)
+
+NOTIFICATIONS = [
+    dict(
+        update=[
+            _update("Ethernet1", "oper-status", "UP"),
+            _update("Ethernet1", "last-change", LAST_CHANGE),
+            _update("Ethernet1", "description", "uplink"),
+            _update("Ethernet2", "oper-status", "DOWN"),
+        ]
+    ),
+    dict(update=[_update("Ethernet3", "oper-status", "UP")]),
+    dict(delete=["interfaces/interface[name=Ethernet3]/state/oper-status"]),
+]
+
+
+def test_subscription():
+    async def run():
+        server = GnmiServer()
+        store = await _subscribed(_device(server), *NOTIFICATIONS)
+        return server, store
+
+    server, store = asyncio.run(run())
+
+    assert server.subscriptions == [(gnmi.SUBSCRIBE_PATHS, "on_change")]
+    assert store == {
+        "Ethernet1": {
+            "oper-status": "UP",
+            "last-change": LAST_CHANGE,
+            "description": "uplink",
+        },
+        "Ethernet2": {"oper-status": "DOWN"},
+    }
+
+
+def test_subscription_resubscribe(monkeypatch):
+    monkeypatch.setattr(gnmi, "_RESUBSCRIBE_DELAY", 0)
+
+    async def run():
+        server = GnmiServer()
+        store = await _subscribed(
+            _device(server), NOTIFICATIONS[0], ConnectionResetError("reset")
+        )
+        server.push(NOTIFICATIONS[1])
+        await server.drained()
+        return server, store
+
+    server, store = asyncio.run(run())
+    assert len(server.subscriptions) == 2
+    assert set(store) == {"Ethernet1", "Ethernet2"}
+
+
+def test_eapi_publish():
+    async def run():
+        device = _device(GnmiServer())
+        await _subscribed(device, NOTIFICATIONS[0])
+        config = interfaces.InterfaceRawCollectorConfig()
+        assert await eapi_gnmi.publish_interfaces(device, 0, config) is None
+        return device.private["interfaces"]
+
+    ifs = asyncio.run(run())
+
+    # Ethernet2 has no last-change value yet, and is not published.
+
+    assert ifs["event"].is_set()
+    assert ifs["data"] == {
+        "interfaces": {
+            "Ethernet1": {
+                "interfaceStatus": "connected",
+                "lastStatusChangeTimestamp": LAST_CHANGE / NS,
+                "description": "uplink",
+            }
+        }
+    }
+
+
+def test_nxapi_publish():
+    async def run():
+        device = _device(GnmiServer())
+        await _subscribed(device, NOTIFICATIONS[0])
+        config = interfaces.InterfaceRawCollectorConfig()
+        assert await nxapi_gnmi.publish_interfaces(device, 0, config) is None
+        return device.private["interfaces"]
+
+    ifs = asyncio.run(run())
+
+    rows = ifs["data"].xpath("TABLE_interface/ROW_interface")
+    assert [row.findtext("interface") for row in rows] == ["Ethernet1"]
+    assert rows[0].findtext("state") == "up"
+    assert rows[0].findtext("eth_link_flapped") in ("01:00:00", "01:00:01")
+
+
+def test_nxapi_flapped_ago():
+    assert nxapi_gnmi._flapped_ago(7 * 3600 + 20 * 60 + 17) == "07:20:17"
+    assert nxapi_gnmi._flapped_ago(3 * 86400 + 4 * 3600 + 59) == "3d04h"
@@ -0,0 +1,111 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Tests for the Cisco IOS SNMP interfaces collector coroutine, run against a stub
+device with the netpaca SNMP functions replaced by the table walk results.
+"""
+
+from types import SimpleNamespace
+import asyncio
+import logging
+
+import pytest
+
+pytest.importorskip("netpaca")
+pytest.importorskip("maya")
+
+import netpaca_interfaces as interfaces  # noqa: E402
+from netpaca_interfaces import ios_snmp, polling  # noqa: E402
+
+
+def _returns(value):
+    async def coro(*args, **kwargs):
+        return value
+
+    return coro
+
+
+def _raises(exc):
+    async def coro(*args, **kwargs):
+        raise exc
+
+    return coro
+
+
+@pytest.fixture()
+def snmp(monkeypatch):
+    import netpaca.aiosnmp.system as snmp_system
+    import netpaca.aiosnmp.interfaces as snmp_ifs
+
+    monkeypatch.setenv("SNMP_COMMUNITY", "public")
+    monkeypatch.setattr(snmp_system, "get_sys_uptime", _returns(100_000))
+    monkeypatch.setattr(snmp_system, "get_snmpengine_uptime", _returns(1_000))
+    monkeypatch.setattr(
+        snmp_ifs, "get_if_name_table", _returns({1: "Gi1/0/1", 2: "Gi1/0/2"})
+    )
+    monkeypatch.setattr(snmp_ifs, "get_if_alias_table", _returns({1: "uplink", 2: ""}))
+    monkeypatch.setattr(
+        snmp_ifs, "get_if_operstatus_table", _returns({1: True, 2: False})
+    )
+    monkeypatch.setattr(snmp_ifs, "get_if_lastchange_table", _returns({1: 5_000, 2: 0}))
+    return snmp_ifs
+
+
+def _device(config):
+    return SimpleNamespace(
+        name="ios-1",
+        log=logging.getLogger("test"),
+        private={
+            "interfaces": {
+                "event": asyncio.Event(),
+                "poll": None,
+                "breaker": polling.circuit_breaker(config),
+            }
+        },
+    )
+
+
+def test_get_interfaces(snmp):
+    config = interfaces.InterfaceRawCollectorConfig(breaker_threshold=1)
+    device = _device(config)
+
+    metrics = asyncio.run(ios_snmp.get_interfaces(device, 0, config))
+
+    ifs = device.private["interfaces"]
+    assert metrics is None
+    assert ifs["event"].is_set()
+    assert ifs["available"] is True
+    assert ifs["breaker"].failures == 0
+    assert ifs["data"]["Gi1/0/1"] == {
+        "if_name": "Gi1/0/1",
+        "if_desc": "uplink",
+        "if_link_up": True,
+        "if_lastchange": 5_000,
+    }
+    assert set(ifs["data"]) == {"Gi1/0/1", "Gi1/0/2"}
+
+
+def test_get_interfaces_failed(snmp, monkeypatch):
+    monkeypatch.setattr(snmp, "get_if_name_table", _raises(OSError("timeout")))
+    config = interfaces.InterfaceRawCollectorConfig(breaker_threshold=1)
+    device = _device(config)
+
+    assert asyncio.run(ios_snmp.get_interfaces(device, 0, config)) is None
+
+    ifs = device.private["interfaces"]
+    assert "data" not in ifs
+    assert ifs["breaker"].failures == 1
+    assert ifs["available"] is False
@@ -0,0 +1,75 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Tests for the NX-OS normalized snapshot, whose last_change values are derived
+from the relative "eth_link_flapped" durations.
+"""
+
+import pytest
+
+pytest.importorskip("netpaca")
+etree = pytest.importorskip("lxml.etree")
+
+from netpaca_interfaces import snapshot  # noqa: E402
+
+NOW = 1_600_000_000.0
+
+
+def _xml(*flapped):
+    rows = "".join(
+        "<ROW_interface>"
+        f"<interface>Ethernet1/{num}</interface><state>up</state>"
+        f"<eth_link_flapped>{value}</eth_link_flapped>"
+        "</ROW_interface>"
+        for num, value in enumerate(flapped, start=1)
+    )
+    return etree.fromstring(
+        f"<__readonly__><TABLE_interface>{rows}</TABLE_interface></__readonly__>"
+    )
+
+
+def test_normalize_nxos_formats():
+    snap = snapshot.normalize_nxos(
+        _xml("07:20:17", "3d04h", "6week(s) 1day(s)", "never"), NOW
+    )
+    changes = [rec["last_change"] for rec in snap.values()]
+    assert changes == [
+        NOW - (7 * 3600 + 20 * 60 + 17),
+        NOW - (3 * 86400 + 4 * 3600),
+        NOW - (43 * 86400),
+        None,
+    ]
+
+
+def test_normalize_nxos_stable_across_polls():
+    prev = snapshot.normalize_nxos(_xml("00:10:00", "3d04h"), NOW)
+
+    # ten minutes later the coarse format is unchanged, and the seconds format
+    # advanced by the same ten minutes; neither link flapped.
+
+    curr = snapshot.normalize_nxos(_xml("00:20:00", "3d04h"), NOW + 600, prev)
+    assert curr == prev
+    assert not snapshot.diff(prev, curr)
+
+
+def test_normalize_nxos_flap():
+    prev = snapshot.normalize_nxos(_xml("00:10:00", "3d04h"), NOW)
+    curr = snapshot.normalize_nxos(_xml("00:00:30", "00:01:00"), NOW + 600, prev)
+    delta = snapshot.diff(prev, curr)
+    assert delta.changed == {
+        "Ethernet1/1": {"last_change"},
+        "Ethernet1/2": {"last_change"},
+    }